@@ -3,18 +3,24 @@ import json
 from openai import AzureOpenAI
 import streamlit as st
 from initialize import init_openai_client
+from tools import load_json_file, loads_json
+from audio_process import build_speech_audio_config, get_speech_config
 import azure.cognitiveservices.speech as speechsdk
 
 def get_pronunciation_assessment(
-    user, pronunciation_config, reference_text, audio_file_path
+    user, pronunciation_config, reference_text, audio_file_path, audio_bytes=None
 ):
-    """Get pronunciation assessment from Azure Speech Service."""
+    """Get pronunciation assessment from Azure Speech Service.
+
+    audio_bytes, when given, is the WAV content of audio_file_path and is
+    streamed to the SDK instead of reading the file back from disk.
+    """
     try:
-        speech_config = speechsdk.SpeechConfig(
-            subscription=st.secrets["Azure_Speech"]["SPEECH_KEY"],
-            region=st.secrets["Azure_Speech"]["SPEECH_REGION"],
+        speech_config = get_speech_config(
+            st.secrets["Azure_Speech"]["SPEECH_KEY"],
+            st.secrets["Azure_Speech"]["SPEECH_REGION"],
         )
-        audio_input = speechsdk.AudioConfig(filename=audio_file_path)
+        audio_input = build_speech_audio_config(audio_file_path, audio_bytes)
         recognizer = speechsdk.SpeechRecognizer(
             speech_config=speech_config, audio_config=audio_input
         )
@@ -24,7 +30,7 @@ def get_pronunciation_assessment(
         pronunciation_config.apply_to(recognizer)
 
         result = recognizer.recognize_once_async().get()
-        pronunciation_result = json.loads(
+        pronunciation_result = loads_json(
             result.properties.get(speechsdk.PropertyId.SpeechServiceResponse_JsonResult)
         )
 
@@ -227,8 +233,7 @@ def ai_feedback_test(client, messages):
         if user_input.lower() == "q":
             break
         elif user_input.split()[0].lower() == "r":
-            with open(f"asset/1/history/{user_input.split()[1]}.json", "r", encoding="utf-8") as f:
-                pronunciation_result = json.load(f)
+            pronunciation_result = load_json_file(f"asset/1/history/{user_input.split()[1]}.json")
             errors = parse_pronunciation_assessment(pronunciation_result)[-1]
             processed_user_input = f"{errors}"
         else:
@@ -1,8 +1,18 @@
 from datetime import datetime
-import soundfile as sf
+import io
+import wave
+import numpy as np
 import os
+from types import MappingProxyType
 import streamlit as st
 
+TICKS_PER_SECOND = 10000000
+# Shared read-only fallbacks for missing PronunciationAssessment blocks and lists
+_EMPTY = MappingProxyType({})
+_EMPTY_TUPLE = ()
+AUDIO_BLOCK_SECONDS = 30
+WAVEFORM_PLOT_RATE = 2000
+
 def save_audio_to_file(audio_bytes_io, filename=None):
     """Save audio data from BytesIO to a WAV file."""
     if audio_bytes_io is None:
@@ -20,13 +30,166 @@ def save_audio_to_file(audio_bytes_io, filename=None):
         f.write(audio_bytes_io.getvalue())
     return filename
 
-def extract_timestamps_from_pronunciation_result(pronunciation_result):
+@st.cache_resource(show_spinner=False)
+def get_speech_config(speech_key, service_region):
+    """
+    Create the Azure SpeechConfig once per (key, region) and server process.
+    
+    Args:
+        speech_key (str): Azure Speech subscription key
+        service_region (str): Azure region of the Speech resource
+        
+    Returns:
+        speechsdk.SpeechConfig: Shared speech configuration
+    """
+    import azure.cognitiveservices.speech as speechsdk
+
+    return speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+
+def build_speech_audio_config(audio_file_path=None, audio_bytes=None):
+    """
+    Build the Azure Speech AudioConfig for an assessment.
+    
+    When the recording is already in memory as WAV bytes, its PCM frames are
+    pushed to the SDK directly so the file just written is not read back.
+    
+    Args:
+        audio_file_path (str, optional): Path to a WAV file, used when audio_bytes is None
+        audio_bytes (bytes, optional): Complete PCM WAV file contents
+        
+    Returns:
+        speechsdk.audio.AudioConfig: Audio input for a SpeechRecognizer
+    """
+    import azure.cognitiveservices.speech as speechsdk
+
+    if audio_bytes is None:
+        return speechsdk.audio.AudioConfig(filename=audio_file_path)
+
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=wav.getframerate(),
+            bits_per_sample=wav.getsampwidth() * 8,
+            channels=wav.getnchannels(),
+        )
+        frames = wav.readframes(wav.getnframes())
+
+    stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    stream.write(frames)
+    stream.close()
+    return speechsdk.audio.AudioConfig(stream=stream)
+
+def iter_audio_blocks(audio_file, block_seconds=AUDIO_BLOCK_SECONDS):
+    """
+    Stream an audio file as mono float32 blocks instead of decoding it whole.
+    
+    Args:
+        audio_file (str | file-like): Path or file object readable by soundfile
+        block_seconds (int): Length of each yielded block in seconds
+        
+    Yields:
+        tuple: (block, sample_rate) where block is a 1-D float32 ndarray
+    """
+    # soundfile (and libsndfile) is only needed by the waveform helpers, so it is
+    # imported here rather than at module import, which every chart page pays for
+    import soundfile as sf
+
+    sample_rate = sf.info(audio_file).samplerate
+    if hasattr(audio_file, "seek"):
+        audio_file.seek(0)
+    for block in sf.blocks(audio_file, blocksize=int(sample_rate * block_seconds), dtype="float32"):
+        if block.ndim > 1:
+            block = block.mean(axis=1)
+        yield block, sample_rate
+
+def load_waveform_for_plot(audio_file, plot_rate=WAVEFORM_PLOT_RATE):
+    """
+    Load a decimated waveform for plotting, streaming the file block by block.
+    
+    Peak memory is bounded by one block plus the decimated output, so long
+    lesson recordings are never held fully decoded in memory.
+    
+    Args:
+        audio_file (str | file-like): Path or file object readable by soundfile
+        plot_rate (int): Maximum number of samples per second kept for plotting
+        
+    Returns:
+        tuple: (waveform, sample_rate) where sample_rate is the rate of the
+               returned (decimated) waveform
+    """
+    chunks = []
+    step = 1
+    sample_rate = plot_rate
+    carry = 0
+    for block, native_rate in iter_audio_blocks(audio_file):
+        step = max(1, native_rate // plot_rate)
+        sample_rate = native_rate / step
+        # Keep the decimation phase continuous across block boundaries
+        chunks.append(block[carry::step])
+        carry = (carry - len(block)) % step
+    if not chunks:
+        return np.zeros(0, dtype=np.float32), sample_rate
+    return np.concatenate(chunks), sample_rate
+
+def extract_word_columns(pronunciation_result):
+    """
+    Extract word-level fields from pronunciation assessment result into columnar arrays.
+    
+    The nested NBest[0].Words list is walked exactly once so that chart and
+    timestamp helpers can share the result instead of re-traversing the dicts.
+    
+    Args:
+        pronunciation_result (dict): JSON result from Azure pronunciation assessment
+        
+    Returns:
+        dict: Dictionary of equally sized NumPy arrays in the following format:
+              {
+                  "text": ndarray[object],        # Word text as returned by Azure
+                  "accuracy": ndarray[float32],   # AccuracyScore (NaN when missing)
+                  "offset": ndarray[int64],       # Offset in ticks (0 when missing)
+                  "duration": ndarray[int64],     # Duration in ticks (0 when missing)
+                  "error_type": ndarray[object]   # ErrorType (None when missing)
+              }
+    """
+    nbest = (pronunciation_result or {}).get("NBest") or [{}]
+    words = nbest[0].get("Words") or _EMPTY_TUPLE
+
+    texts, accuracies, offsets, durations, error_types = [], [], [], [], []
+    for word in words:
+        assessment = word.get("PronunciationAssessment") or _EMPTY
+        accuracy = assessment.get("AccuracyScore")
+        texts.append(word.get("Word", ""))
+        accuracies.append(np.nan if accuracy is None else accuracy)
+        offsets.append(word.get("Offset") or 0)
+        durations.append(word.get("Duration") or 0)
+        error_types.append(assessment.get("ErrorType"))
+
+    return {
+        "text": np.array(texts, dtype=object),
+        "accuracy": np.array(accuracies, dtype=np.float32),
+        "offset": np.array(offsets, dtype=np.int64),
+        "duration": np.array(durations, dtype=np.int64),
+        "error_type": np.array(error_types, dtype=object),
+    }
+
+def _columns_to_seconds(word_columns):
+    """Convert tick columns to rounded (start, end, duration) lists in seconds."""
+    start_times = word_columns["offset"] / TICKS_PER_SECOND
+    durations = word_columns["duration"] / TICKS_PER_SECOND
+    end_times = start_times + durations
+    return (
+        np.round(start_times, 3).tolist(),
+        np.round(end_times, 3).tolist(),
+        np.round(durations, 3).tolist(),
+    )
+
+def extract_timestamps_from_pronunciation_result(pronunciation_result, word_columns=None):
     """
     Extract word-level timestamps from pronunciation assessment result.
     Used for all kinds of sentences, including those with repeated words.
     
     Args:
         pronunciation_result (dict): JSON result from Azure pronunciation assessment
+        word_columns (dict, optional): Pre-extracted result of extract_word_columns()
         
     Returns:
         list: List of dictionaries containing word timestamps in the following format:
@@ -48,30 +211,27 @@ def extract_timestamps_from_pronunciation_result(pronunciation_result):
     """
     timestamps = []  
     try:
-        nbest = pronunciation_result.get("NBest", [])
-        if not nbest:
+        if word_columns is None:
+            word_columns = extract_word_columns(pronunciation_result)
+        if len(word_columns["text"]) == 0:
             return timestamps
-        
-        words = nbest[0].get("Words", [])
-        for word in words:
-            start_time_ticks = word.get("Offset", 0)
-            duration_ticks = word.get("Duration", 0)
-            start_time_sec = start_time_ticks / 10000000  # Convert ticks to seconds
-            duration_sec = duration_ticks / 10000000
-            end_time_sec = start_time_sec + duration_sec
-            
+
+        start_times, end_times, durations = _columns_to_seconds(word_columns)
+        for word_text, start_time, end_time, duration in zip(
+            word_columns["text"], start_times, end_times, durations
+        ):
             timestamps.append({
-                "word": word.get("Word", "").lower(),
-                "start_time": round(start_time_sec, 3),
-                "end_time": round(end_time_sec, 3),
-                "duration": round(duration_sec, 3)
+                "word": word_text.lower(),
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": duration
             })
     except Exception as e:
         print(f"Error extracting timestamps: {e}")
     
     return timestamps
 
-def extract_timestamps_dict(pronunciation_result):
+def extract_timestamps_dict(pronunciation_result, word_columns=None):
     """
     Extract word-level timestamps from pronunciation assessment result (optimized for unique words).
     
@@ -81,6 +241,7 @@ def extract_timestamps_dict(pronunciation_result):
     
     Args:
         pronunciation_result (dict): JSON result from Azure pronunciation assessment
+        word_columns (dict, optional): Pre-extracted result of extract_word_columns()
         
     Returns:
         dict: Dictionary mapping words to their timestamps in the following format:
@@ -113,23 +274,19 @@ def extract_timestamps_dict(pronunciation_result):
     """
     timestamps = {}
     try:
-        nbest = pronunciation_result.get("NBest", [])
-        if not nbest:
+        if word_columns is None:
+            word_columns = extract_word_columns(pronunciation_result)
+        if len(word_columns["text"]) == 0:
             return timestamps
-        
-        words = nbest[0].get("Words", [])
-        for word in words:
-            start_time_ticks = word.get("Offset", 0)
-            duration_ticks = word.get("Duration", 0)
-            start_time_sec = start_time_ticks / 10000000  # Convert ticks to seconds
-            duration_sec = duration_ticks / 10000000
-            end_time_sec = start_time_sec + duration_sec
-            
-            word_text = word.get("Word", "").lower()
-            timestamps[word_text] = {
-                "start_time": round(start_time_sec, 3),
-                "end_time": round(end_time_sec, 3),
-                "duration": round(duration_sec, 3)
+
+        start_times, end_times, durations = _columns_to_seconds(word_columns)
+        for word_text, start_time, end_time, duration in zip(
+            word_columns["text"], start_times, end_times, durations
+        ):
+            timestamps[word_text.lower()] = {
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": duration
             }
     except Exception as e:
         print(f"Error extracting timestamps: {e}")
@@ -1,26 +1,52 @@
 ﻿import io
+import logging
 import os
-import json
-import librosa
-import time
+import re
+import threading
 import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from html import escape
 import pandas as pd
 import streamlit as st
-import soundfile as sf
-import azure.cognitiveservices.speech as speechsdk
-from datetime import datetime
 import altair as alt
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, RegularPolygon
-from matplotlib.path import Path
-from matplotlib.projections import register_projection
-from matplotlib.projections.polar import PolarAxes
-from matplotlib.spines import Spine
-from matplotlib.transforms import Affine2D
-from streamlit_advanced_audio import audix, CustomizedRegion, RegionColorOptions
-from audio_process import extract_timestamps_dict
-
-plt.rcParams["font.family"] = "MS Gothic"
+from audio_process import (
+    _EMPTY,
+    _EMPTY_TUPLE,
+    build_speech_audio_config,
+    extract_timestamps_dict,
+    extract_word_columns,
+    get_speech_config,
+)
+from tools import load_best_recognition, load_json_file, loads_json
+
+logger = logging.getLogger(__name__)
+# Assessment diagnostics are debug-level; set PHONOECHO_LOG_LEVEL=DEBUG to see them.
+# Unknown level names fall back to WARNING instead of failing the import.
+_LOG_LEVEL = logging.getLevelName(os.environ.get("PHONOECHO_LOG_LEVEL", "WARNING").upper())
+if not isinstance(_LOG_LEVEL, int):
+    _LOG_LEVEL = logging.WARNING
+logger.setLevel(_LOG_LEVEL)
+# Nothing configures root logging, and the last-resort handler drops records below
+# WARNING, so lower levels get their own stderr handler
+if _LOG_LEVEL < logging.WARNING and not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_log_handler)
+
+# matplotlib, the Azure Speech SDK and streamlit_advanced_audio are imported
+# lazily by the helpers that use them
+_RADAR_READY = False
+
+# Red (0-39), yellow (40-59), light green (60-79), dark green (80-100)
+SCORE_COLORS = ("#ff0000", "#ffff00", "#90ee90", "#006400")
+OMITTED_WORD_COLOR = "#ff8c00"  # orange
+# Color for every integer score 0-100, so get_color is a single index
+SCORE_COLOR_LUT = tuple(
+    SCORE_COLORS[(score >= 40) + (score >= 60) + (score >= 80)] for score in range(101)
+)
+
 
 def get_color(score):
     """
@@ -35,20 +61,46 @@ def get_color(score):
         str: hex color code
     """
     if score is None:
-        # omitted words
-        return "#ff8c00"  # orange
-    elif score >= 80:
-        # high proficiency
-        return "#006400"  # dark green
-    elif score >= 60:
-        # satisfactory performance
-        return "#90ee90"  # light green
-    elif score >= 40:
-        # moderate proficiency
-        return "#ffff00"  # yellow
-    else:
-        # needing significant improvement (0-39)
-        return "#ff0000"  # red
+        return OMITTED_WORD_COLOR
+    return SCORE_COLOR_LUT[min(max(int(score), 0), 100)]
+
+
+@lru_cache(maxsize=128)
+def _compute_contrast_text_color(hex_color: str) -> str:
+    """Pick dark or light text from the background's relative luminance."""
+    if not isinstance(hex_color, str) or not hex_color.startswith("#") or len(hex_color) != 7:
+        return "#f9fafb"
+
+    try:
+        r = int(hex_color[1:3], 16)
+        g = int(hex_color[3:5], 16)
+        b = int(hex_color[5:7], 16)
+    except ValueError:
+        return "#f9fafb"
+
+    luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b
+    return "#0f172a" if luminance > 160 else "#f9fafb"
+
+
+SCORE_COLOR_THRESHOLDS = np.array([40, 60, 80])
+SCORE_COLOR_TABLE = np.array(SCORE_COLORS, dtype=object)
+
+
+def get_colors(scores, omitted=None) -> np.ndarray:
+    """
+    Vectorized get_color() for a whole array of scores.
+    
+    Args:
+        scores: array-like of pronunciation scores (0-100)
+        omitted: optional boolean mask of omitted entries (colored as None)
+    
+    Returns:
+        np.ndarray: object array of hex color codes
+    """
+    colors = SCORE_COLOR_TABLE[np.digitize(scores, SCORE_COLOR_THRESHOLDS)]
+    if omitted is not None:
+        colors[omitted] = OMITTED_WORD_COLOR
+    return colors
 
 
 ERROR_TYPE_LABELS_JA = {
@@ -59,7 +111,7 @@ ERROR_TYPE_LABELS_JA = {
     "unknown": "不明",
 }
 
-DISPLAY_ERROR_KEYS = {"omission", "mispronunciation", "insertion"}
+DISPLAY_ERROR_KEYS = frozenset({"omission", "mispronunciation", "insertion"})
 
 ERROR_CHART_COLOR_MAP = {
     "omission": "#FF4B4B",
@@ -73,6 +125,17 @@ ERROR_CHART_ORDER = [
     "insertion",
 ]
 
+# Doughnut legend order with labels and colors resolved once; only the counts vary per call
+ERROR_CHART_KEYS_LABELS = tuple(
+    (key, ERROR_TYPE_LABELS_JA.get(key, key.title()))
+    for key in ERROR_CHART_ORDER
+    if key in DISPLAY_ERROR_KEYS
+)
+ERROR_CHART_COLOR_SCALE = {
+    "domain": [label for _, label in ERROR_CHART_KEYS_LABELS],
+    "range": [ERROR_CHART_COLOR_MAP.get(key, "#6b7280") for key, _ in ERROR_CHART_KEYS_LABELS],
+}
+
 ERROR_ROW_COLOR_MAP = {
     "omission": "#b45309",
     "mispronunciation": "#b91c1c",
@@ -80,7 +143,19 @@ ERROR_ROW_COLOR_MAP = {
     "unknown": "#6b7280",
 }
 
+# Text colors for every background this module paints, resolved once at import
+PALETTE_TEXT_COLOR_MAP = {
+    color: _compute_contrast_text_color(color)
+    for color in (
+        *SCORE_COLORS,
+        OMITTED_WORD_COLOR,
+        *ERROR_CHART_COLOR_MAP.values(),
+        *ERROR_ROW_COLOR_MAP.values(),
+    )
+}
 
+
+@lru_cache(maxsize=64)
 def normalize_error_key(value):
     """Normalize Azure error type names so they can be mapped reliably."""
     if not value:
@@ -94,6 +169,7 @@ def normalize_error_key(value):
     )
 
 
+@lru_cache(maxsize=64)
 def get_error_label_ja(value):
     """Return the Japanese label for a given error type."""
     key = normalize_error_key(value)
@@ -104,12 +180,15 @@ def get_error_label_ja(value):
     return ERROR_TYPE_LABELS_JA["unknown"]
 
 
+OMISSION_CANDIDATE_ERROR_TYPES = frozenset({None, "None", "Mispronunciation"})
+
+
 def is_omitted_word(word: dict) -> bool:
     """Return True when Azure marks a reference word as omitted."""
     if not word:
         return False
 
-    assessment = word.get("PronunciationAssessment") or {}
+    assessment = word.get("PronunciationAssessment") or _EMPTY
     error_type = assessment.get("ErrorType")
     if error_type == "Omission":
         return True
@@ -117,12 +196,111 @@ def is_omitted_word(word: dict) -> bool:
     duration = word.get("Duration")
     accuracy = assessment.get("AccuracyScore")
     if (duration is None or duration == 0) and (accuracy is None or accuracy == 0):
-        return error_type in (None, "None", "Mispronunciation")
+        return error_type in OMISSION_CANDIDATE_ERROR_TYPES
 
     return False
 
+
+def omitted_word_mask(word_columns: dict) -> np.ndarray:
+    """Vectorized is_omitted_word() over the arrays from extract_word_columns()."""
+    error_types = word_columns["error_type"]
+    accuracy = word_columns["accuracy"]
+    explicit = np.fromiter(
+        (error_type == "Omission" for error_type in error_types),
+        dtype=bool,
+        count=len(error_types),
+    )
+    candidate = np.fromiter(
+        (error_type in OMISSION_CANDIDATE_ERROR_TYPES for error_type in error_types),
+        dtype=bool,
+        count=len(error_types),
+    )
+    silent = (word_columns["duration"] == 0) & (np.isnan(accuracy) | (accuracy == 0))
+    return explicit | (silent & candidate)
+
+
+@dataclass(frozen=True)
+class AssessedUtterance:
+    """
+    Pronunciation assessment result pre-parsed once for all chart renderers.
+    
+    Attributes:
+        overall (dict): NBest[0].PronunciationAssessment overall scores
+        words (list): NBest[0].Words as returned by Azure
+        word_columns (dict): Columnar word fields from extract_word_columns()
+        omitted (np.ndarray): Boolean mask of omitted words
+        phoneme_scores (np.ndarray): Flat float32 accuracy scores of the phonemes
+                                     of non-omitted words, NaN where missing
+    """
+
+    overall: dict
+    words: list
+    word_columns: dict
+    omitted: np.ndarray
+    phoneme_scores: np.ndarray
+
+
+def build_assessed_utterance(pronunciation_result) -> AssessedUtterance:
+    """Walk a pronunciation assessment result once and return its AssessedUtterance."""
+    best = pronunciation_result["NBest"][0]
+    words = best.get("Words") or []
+    word_columns = extract_word_columns(pronunciation_result)
+    omitted = omitted_word_mask(word_columns)
+    phoneme_scores = np.fromiter(
+        (
+            np.nan if score is None else score
+            for word, is_omitted in zip(words, omitted.tolist())
+            if not is_omitted
+            for score in (
+                (phoneme.get("PronunciationAssessment") or _EMPTY).get("AccuracyScore", 0)
+                for phoneme in word.get("Phonemes") or _EMPTY_TUPLE
+            )
+        ),
+        dtype=np.float32,
+    )
+    return AssessedUtterance(
+        overall=best.get("PronunciationAssessment") or {},
+        words=words,
+        word_columns=word_columns,
+        omitted=omitted,
+        phoneme_scores=phoneme_scores,
+    )
+
+@st.cache_data(show_spinner=False)
+def load_target_timestamps(target_json_path):
+    """
+    Load a reference pronunciation result and extract its word timestamps.
+    The learning database is static, so each file is read and parsed once per process.
+    
+    Args:
+        target_json_path (str): Path to the reference JSON in assets/learning_database
+    
+    Returns:
+        dict: Word timestamps as returned by extract_timestamps_dict()
+    """
+    return extract_timestamps_dict(load_best_recognition(target_json_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_user_timestamps(recognition_id, _pronunciation_result, _word_columns=None):
+    """
+    Extract word timestamps for one recognized attempt.
+    Keyed on the Azure recognition Id, which is unique per result, so fragment
+    reruns reuse the dict without hashing the whole nested result.
+    
+    Args:
+        recognition_id (str): "Id" field of the pronunciation result
+        _pronunciation_result (dict): Pronunciation result (excluded from the cache key)
+        _word_columns (dict, optional): Pre-extracted result of extract_word_columns()
+    
+    Returns:
+        dict: Word timestamps as returned by extract_timestamps_dict()
+    """
+    return extract_timestamps_dict(_pronunciation_result, word_columns=_word_columns)
+
+
 @st.fragment
-def create_waveform_plot(sentence_order, user, lesson, practice_times, lowest_word_phonemes_dict, pronunciation_result):
+def create_waveform_plot(sentence_order, user, lesson, practice_times, lowest_word_phonemes_dict, pronunciation_result, assessed=None):
     """
     Creates customized regions for waveform visualization using streamlit_advanced_audio.
     Highlights word intervals with colors based on pronunciation accuracy scores.
@@ -134,6 +312,7 @@ def create_waveform_plot(sentence_order, user, lesson, practice_times, lowest_wo
         practice_times (int): Number of practice attempts
         lowest_word_phonemes_dict (dict): Dictionary with lowest-scoring word info
         pronunciation_result (dict): Dictionary containing pronunciation assessment data
+        assessed (AssessedUtterance, optional): Pre-parsed pronunciation_result
     
     Returns:
         None: Renders audix components directly
@@ -141,9 +320,7 @@ def create_waveform_plot(sentence_order, user, lesson, practice_times, lowest_wo
     # Load target pronunciation result (reference audio)
     target_json_path = f"assets/learning_database/{sentence_order[lesson - 1]}.json"
     try:
-        with open(target_json_path, "r", encoding="utf-8") as f:
-            target_result = json.load(f)
-        target_timestamps = extract_timestamps_dict(target_result)
+        target_timestamps = load_target_timestamps(target_json_path)
     except FileNotFoundError:
         st.error(f"Target pronunciation file not found: {target_json_path}")
         target_timestamps = {}
@@ -152,62 +329,46 @@ def create_waveform_plot(sentence_order, user, lesson, practice_times, lowest_wo
         target_timestamps = {}
     
     # Extract user timestamps from pronunciation_result
-    user_timestamps = extract_timestamps_dict(pronunciation_result)
+    word_columns = assessed.word_columns if assessed is not None else None
+    recognition_id = (pronunciation_result or {}).get("Id")
+    if recognition_id:
+        user_timestamps = load_user_timestamps(recognition_id, pronunciation_result, word_columns)
+    else:
+        user_timestamps = extract_timestamps_dict(pronunciation_result, word_columns=word_columns)
 
-    # Get timestamps for the lowest-scoring word
+    # Timestamp keys are already lowercase, so only the looked-up word needs folding
     lowest_word = lowest_word_phonemes_dict["word"].lower()
-    target_start_end = target_timestamps.get(lowest_word, None)
-    user_start_end = user_timestamps.get(lowest_word, None)
+    target_audio_path = f"assets/learning_database/{sentence_order[lesson - 1]}.wav"
+    user_audio_path = f"assets/history_database/{user}/{lesson}-{practice_times}.wav"
 
     # Display target audio with timestamp if available
-    if target_start_end:
-        if target_start_end["start_time"] and target_start_end["end_time"] and target_start_end["end_time"] > target_start_end["start_time"]:
-            audix(
-                f"assets/learning_database/{sentence_order[lesson - 1]}.wav",
-                key="target",
-                start_time=target_start_end["start_time"],
-                end_time=target_start_end["end_time"]
-            )
-        else:
-            audix(f"assets/learning_database/{sentence_order[lesson - 1]}.wav", key="target")
-    else:
-        st.warning(f"Word '{lowest_word}' not found in target audio timestamps")
-        audix(f"assets/learning_database/{sentence_order[lesson - 1]}.wav", key="target")
+    _render_word_clip(target_audio_path, "target", target_timestamps.get(lowest_word), lowest_word)
 
     # Display user audio with timestamp if available
-    if user_start_end:
-        if user_start_end["start_time"] and user_start_end["end_time"] and user_start_end["end_time"] > user_start_end["start_time"]:
+    _render_word_clip(user_audio_path, "user", user_timestamps.get(lowest_word), lowest_word)
+
+
+def _render_word_clip(audio_path, key, start_end, word):
+    """Render audix for audio_path, clipped to the word's start/end when they are valid."""
+    from streamlit_advanced_audio import audix
+
+    if start_end:
+        if start_end["start_time"] and start_end["end_time"] and start_end["end_time"] > start_end["start_time"]:
             audix(
-                f"assets/history_database/{user}/{lesson}-{practice_times}.wav",
-                key="user",
-                start_time=user_start_end["start_time"],
-                end_time=user_start_end["end_time"]
+                audio_path,
+                key=key,
+                start_time=start_end["start_time"],
+                end_time=start_end["end_time"]
             )
         else:
-            audix(f"assets/history_database/{user}/{lesson}-{practice_times}.wav", key="user")
+            audix(audio_path, key=key)
     else:
-        st.warning(f"Word '{lowest_word}' not found in user audio timestamps")
-        audix(f"assets/history_database/{user}/{lesson}-{practice_times}.wav", key="user")
+        st.warning(f"Word '{word}' not found in {key} audio timestamps")
+        audix(audio_path, key=key)
 
-def create_syllable_table(pronunciation_result):
-    """
-    Creates a compact pronunciation evaluation table similar to ALL-Talk system.
-    Displays overall scores, word-level, and phoneme-level assessments in a grid format.
-    
-    Args:
-        pronunciation_result (dict): Dictionary containing pronunciation assessment data
-    
-    Returns:
-        str: HTML string for the evaluation table with horizontal scrolling
-    """
-    # Extract overall assessment
-    overall = pronunciation_result["NBest"][0]["PronunciationAssessment"]
-    words = pronunciation_result["NBest"][0]["Words"]
-    
-    # Start building HTML with improved styling
-    output = """
+SYLLABLE_TABLE_CSS = """
     <style>
-        .table-container {{
+        .table-container {
             overflow-x: auto;
             max-width: 100%;
             max-height: 300px;
@@ -222,16 +383,16 @@ def create_syllable_table(pronunciation_result):
             width: 100%;
             height: 100%;
             margin: 0 auto;
-        }}
-        .scoreboard {{
+        }
+        .scoreboard {
             display: inline-flex;
             flex-wrap: nowrap;
             gap: 0;
             margin-bottom: 14px;
             justify-content: center;
             align-items: center;
-        }}
-        .score-card {{
+        }
+        .score-card {
             display: flex;
             flex-direction: column;
             align-items: center;
@@ -243,57 +404,57 @@ def create_syllable_table(pronunciation_result):
             min-width: 90px;
             box-shadow: 0 0 6px rgba(0, 0, 0, 0.2);
             flex: 0 0 auto;
-        }}
-        .score-card:first-child {{
+        }
+        .score-card:first-child {
             border-top-left-radius: 10px;
             border-bottom-left-radius: 10px;
-        }}
-        .score-card:last-child {{
+        }
+        .score-card:last-child {
             border-top-right-radius: 10px;
             border-bottom-right-radius: 10px;
-        }}
-        .score-card + .score-card {{
+        }
+        .score-card + .score-card {
             border-left: 0;
-        }}
-        .score-card-title {{
+        }
+        .score-card-title {
             font-size: 11px;
             text-transform: uppercase;
             letter-spacing: 0.08em;
             color: rgba(255, 255, 255, 0.8);
             margin-bottom: 6px;
-        }}
-        .score-card-value {{
+        }
+        .score-card-value {
             font-size: 20px;
             font-weight: 700;
             color: #ffffff;
             line-height: 1;
-        }}
-        .eval-table {{
+        }
+        .eval-table {
             border-collapse: collapse;
             width: 100%;
             font-size: 14px;
             background-color: #0E1117;
             color: white;
             margin: 0 auto;
-        }}
-        .eval-table td {{
+        }
+        .eval-table td {
             border: 2px solid #555;
             padding: 10px;
             text-align: center;
-        }}
-        .eval-table td.word-row-wrapper {{
+        }
+        .eval-table td.word-row-wrapper {
             padding: 0;
             border: none;
-        }}
-        .word-card-row {{
+        }
+        .word-card-row {
             display: inline-flex;
             flex-wrap: nowrap;
             gap: 0;
             justify-content: center;
             width: fit-content;
             margin: 0 auto;
-        }}
-        .word-card {{
+        }
+        .word-card {
             display: flex;
             flex-direction: column;
             gap: 0;
@@ -304,19 +465,20 @@ def create_syllable_table(pronunciation_result):
             border: 1px solid #2f3948;
             border-radius: 0;
             overflow: hidden;
-        }}
-        .word-card:first-child {{
+            contain: layout style;
+        }
+        .word-card:first-child {
             border-top-left-radius: 6px;
             border-bottom-left-radius: 6px;
-        }}
-        .word-card:last-child {{
+        }
+        .word-card:last-child {
             border-top-right-radius: 6px;
             border-bottom-right-radius: 6px;
-        }}
-        .word-card + .word-card {{
+        }
+        .word-card + .word-card {
             border-left: 0;
-        }}
-        .word-header {{
+        }
+        .word-header {
             display: flex;
             align-items: center;
             justify-content: space-between;
@@ -324,26 +486,26 @@ def create_syllable_table(pronunciation_result):
             font-size: 16px;
             font-weight: 600;
             color: #f9fafb;
-        }}
-        .word-text {{
+        }
+        .word-text {
             flex: 1 1 auto;
             text-align: left;
             white-space: nowrap;
-        }}
-        .word-score {{
+        }
+        .word-score {
             margin-left: 8px;
             font-size: 12px;
             font-weight: 500;
             opacity: 0.9;
-        }}
-        .phoneme-strip {{
+        }
+        .phoneme-strip {
             display: grid;
             width: 100%;
             grid-template-columns: repeat(var(--phoneme-count, 1), minmax(0, 1fr));
             border-top: 1px solid rgba(255, 255, 255, 0.08);
             background-color: rgba(17, 24, 39, 0.8);
-        }}
-        .phoneme-item {{
+        }
+        .phoneme-item {
             display: inline-flex;
             align-items: center;
             justify-content: center;
@@ -353,31 +515,31 @@ def create_syllable_table(pronunciation_result):
             box-sizing: border-box;
             font-weight: 600;
             white-space: nowrap;
-        }}
-        .phoneme-item:last-child {{
+        }
+        .phoneme-item:last-child {
             border-right: none;
-        }}
-        .phoneme-placeholder {{
+        }
+        .phoneme-placeholder {
             display: inline-flex;
             align-items: center;
             justify-content: center;
             padding: 6px 12px;
             grid-column: 1 / -1;
             font-weight: 500;
-        }}
-        .eval-table td.error-row-wrapper {{
+        }
+        .eval-table td.error-row-wrapper {
             padding: 0;
             border: none;
-        }}
-        .error-card-row {{
+        }
+        .error-card-row {
             display: inline-flex;
             flex-wrap: nowrap;
             gap: 0;
             justify-content: center;
             width: fit-content;
             margin: 0 auto;
-        }}
-        .error-card {{
+        }
+        .error-card {
             flex: 0 0 auto;
             padding: 8px 10px;
             font-size: 13px;
@@ -386,20 +548,34 @@ def create_syllable_table(pronunciation_result):
             text-align: center;
             border: 1px solid rgba(15, 23, 42, 0.2);
             border-radius: 0;
-        }}
-        .error-card:first-child {{
+            contain: layout style;
+        }
+        .error-card:first-child {
             border-top-left-radius: 6px;
             border-bottom-left-radius: 6px;
-        }}
-        .error-card:last-child {{
+        }
+        .error-card:last-child {
             border-top-right-radius: 6px;
             border-bottom-right-radius: 6px;
-        }}
-        .error-card + .error-card {{
+        }
+        .error-card + .error-card {
             border-left: 0;
-        }}
+        }
+        .word-overflow {
+            width: 100%;
+            margin-top: 10px;
+            color: white;
+        }
+        .word-overflow summary {
+            cursor: pointer;
+            font-size: 13px;
+            opacity: 0.8;
+            margin-bottom: 8px;
+        }
     </style>
-    <div class="table-container">
+"""
+
+SYLLABLE_TABLE_SCOREBOARD_TEMPLATE = """    <div class="table-container">
         <div class="scoreboard">
             <div class="score-card">
                 <span class="score-card-title">総合スコア</span>
@@ -423,66 +599,161 @@ def create_syllable_table(pronunciation_result):
             </div>
         </div>
         <table class="eval-table">
-    """.format(
-        pron=int(overall.get("PronScore", 0)),
-        acc=int(overall.get("AccuracyScore", 0)),
-        flu=int(overall.get("FluencyScore", 0)),
-        comp=int(overall.get("CompletenessScore", 0)),
-        pros=int(overall.get("ProsodyScore", 0)),
-    )
-
-    def get_contrast_text_color(hex_color: str) -> str:
-        """Return readable text color for the given background."""
-        if not isinstance(hex_color, str) or not hex_color.startswith("#") or len(hex_color) != 7:
-            return "#f9fafb"
+    """
+# Overall score keys in the order of the scoreboard placeholders above
+SYLLABLE_TABLE_SCOREBOARD_KEYS = (
+    "PronScore",
+    "AccuracyScore",
+    "FluencyScore",
+    "CompletenessScore",
+    "ProsodyScore",
+)
+# Static markup between the score values, split once so rendering skips str.format
+SYLLABLE_TABLE_SCOREBOARD_SEGMENTS = tuple(
+    re.split(r"\{\w+\}", SYLLABLE_TABLE_SCOREBOARD_TEMPLATE)
+)
+
+# Words rendered up front; the rest go into a collapsed <details> block so long
+# passages do not put hundreds of cards into the initial layout
+SYLLABLE_TABLE_MAX_VISIBLE_WORDS = 20
+SYLLABLE_TABLE_WORD_ROW_OPEN = (
+    '<tr class="word-row">'
+    '<td class="word-row-wrapper" colspan="5">'
+    '<div class="word-card-row">'
+)
+SYLLABLE_TABLE_ERROR_ROW_OPEN = (
+    '<tr class="error-row">'
+    '<td class="error-row-wrapper" colspan="5">'
+    '<div class="error-card-row">'
+)
+SYLLABLE_TABLE_ROW_CLOSE = "</div></td></tr>"
+
+
+# Styled phoneme opening tag per score bucket (SCORE_COLORS order, then missing scores)
+PHONEME_ITEM_OPEN_TAGS = np.array(
+    [
+        f'<span class="phoneme-item" style="background-color: {color}; color: {PALETTE_TEXT_COLOR_MAP[color]};">'
+        for color in (*SCORE_COLORS, OMITTED_WORD_COLOR)
+    ],
+    dtype=object,
+)
+
+
+def create_syllable_table(pronunciation_result, assessed=None):
+    """
+    Creates a compact pronunciation evaluation table similar to ALL-Talk system.
+    Displays overall scores, word-level, and phoneme-level assessments in a grid format.
+    
+    Args:
+        pronunciation_result (dict): Dictionary containing pronunciation assessment data
+        assessed (AssessedUtterance, optional): Pre-parsed pronunciation_result
+    
+    Returns:
+        str: HTML string for the evaluation table with horizontal scrolling
+    """
+    return "".join(iter_syllable_table_html(pronunciation_result, assessed))
 
-        try:
-            r = int(hex_color[1:3], 16)
-            g = int(hex_color[3:5], 16)
-            b = int(hex_color[5:7], 16)
-        except ValueError:
-            return "#f9fafb"
 
-        luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b
-        return "#0f172a" if luminance > 160 else "#f9fafb"
+def iter_syllable_table_html(pronunciation_result, assessed=None):
+    """
+    Yields the HTML of create_syllable_table() chunk by chunk.
+    
+    The chunks are fragments of a single <table> and must be concatenated
+    before being handed to st.html; each st.html call is a separate element.
+    
+    Args:
+        pronunciation_result (dict): Dictionary containing pronunciation assessment data
+        assessed (AssessedUtterance, optional): Pre-parsed pronunciation_result
+    
+    Yields:
+        str: CSS, scoreboard, per-word card and error-row HTML fragments in order
+    """
+    if assessed is None:
+        assessed = build_assessed_utterance(pronunciation_result)
+    overall = assessed.overall
+    words = assessed.words
+    word_columns = assessed.word_columns
+    word_score_array = np.nan_to_num(word_columns["accuracy"], nan=0.0)
+    omitted_flags = assessed.omitted.tolist()
+    word_scores = word_score_array.tolist()
+    word_colors = get_colors(word_score_array, assessed.omitted).tolist()
+
+    # Phoneme score buckets are resolved in one vectorized pass and mapped straight
+    # to their styled opening tags; the HTML loop below consumes them in the same
+    # word/phoneme order
+    phoneme_scores = assessed.phoneme_scores
+    phoneme_buckets = np.digitize(phoneme_scores, SCORE_COLOR_THRESHOLDS)
+    phoneme_buckets[np.isnan(phoneme_scores)] = len(SCORE_COLORS)
+    phoneme_open_tags = iter(PHONEME_ITEM_OPEN_TAGS[phoneme_buckets].tolist())
+    
+    yield SYLLABLE_TABLE_CSS
+    yield SYLLABLE_TABLE_SCOREBOARD_SEGMENTS[0]
+    for key, segment in zip(SYLLABLE_TABLE_SCOREBOARD_KEYS, SYLLABLE_TABLE_SCOREBOARD_SEGMENTS[1:]):
+        yield str(int(overall.get(key, 0)))
+        yield segment
 
     phoneme_unit_px = 26
     word_char_unit_px = 12
     base_padding_px = 32
     min_card_width_px = 52
 
-    word_views = []
-    for word in words:
-        word_text = word.get("Word", "")
-        word_assessment = word.get("PronunciationAssessment", {})
-        phonemes = word.get("Phonemes") or []
-        omitted = is_omitted_word(word)
-
-        if omitted:
-            word_score = None
-            word_color = get_color(None)
-            score_display = "-"
-            phoneme_count = 1
-        else:
-            word_score = word_assessment.get("AccuracyScore", 0)
-            word_color = get_color(word_score)
-            score_display = f"{int(word_score)}"
-            phoneme_count = max(len(phonemes), 1)
+    # Per-word layout columns, computed up front instead of inside the HTML loop
+    word_phonemes = [word.get("Phonemes") or _EMPTY_TUPLE for word in words]
+    phoneme_counts = np.where(
+        assessed.omitted, 1, np.maximum([len(phonemes) for phonemes in word_phonemes], 1)
+    )
+    text_lengths = np.fromiter(map(len, word_columns["text"]), dtype=np.int64, count=len(words))
+    card_widths = np.maximum(
+        np.maximum(phoneme_counts * phoneme_unit_px, text_lengths * word_char_unit_px + base_padding_px),
+        min_card_width_px,
+    ).tolist()
+    phoneme_counts = phoneme_counts.tolist()
+
+    def format_error_label(error_type, omitted_flag):
+        key = "omission" if omitted_flag else normalize_error_key(error_type)
 
-        header_text_color = get_contrast_text_color(word_color)
+        if key in DISPLAY_ERROR_KEYS:
+            label = ERROR_TYPE_LABELS_JA.get(key, get_error_label_ja(error_type))
+            color = ERROR_ROW_COLOR_MAP.get(key, ERROR_ROW_COLOR_MAP["unknown"])
+            return label, color
+
+        return "&#128077;", "#1f4028"
+
+    # Visible word cards are yielded as they are built; error cards share the same
+    # pass but can only be emitted once the word row is closed. Cards past
+    # SYLLABLE_TABLE_MAX_VISIBLE_WORDS are held back for the collapsed block.
+    yield SYLLABLE_TABLE_WORD_ROW_OPEN
+    visible_words = SYLLABLE_TABLE_MAX_VISIBLE_WORDS
+    error_cards_html = []
+    overflow_word_cards_html = []
+    # Bind hot lookups to locals for the word/phoneme loop
+    append_error_card = error_cards_html.append
+    append_overflow_word_card = overflow_word_cards_html.append
+    next_phoneme_open_tag = phoneme_open_tags.__next__
+    text_color_map = PALETTE_TEXT_COLOR_MAP
+    # Word and phoneme text comes from the Speech service, so it is escaped before
+    # inlining; it only lands in element content, so quotes can stay as they are
+    esc = partial(escape, quote=False)
+    for index, (phonemes, word_text, error_type, omitted, word_score, word_color, phoneme_count, card_min_width) in enumerate(zip(
+        word_phonemes,
+        word_columns["text"],
+        word_columns["error_type"],
+        omitted_flags,
+        word_scores,
+        word_colors,
+        phoneme_counts,
+        card_widths,
+    )):
+        score_display = "-" if omitted else f"{int(word_score)}"
+
+        header_text_color = text_color_map[word_color]
         header_html = (
             f'<div class="word-header" style="background-color: {word_color}; color: {header_text_color};">'
-            f'<span class="word-text">{word_text}</span>'
+            f'<span class="word-text">{esc(word_text)}</span>'
             f'<span class="word-score">{score_display}</span>'
             "</div>"
         )
 
-        card_min_width = max(
-            phoneme_count * phoneme_unit_px,
-            len(word_text) * word_char_unit_px + base_padding_px,
-            min_card_width_px,
-        )
-
         if omitted or not phonemes:
             phoneme_html = (
                 '<div class="phoneme-strip">'
@@ -490,131 +761,128 @@ def create_syllable_table(pronunciation_result):
                 "</div>"
             )
         else:
-            phoneme_html = '<div class="phoneme-strip">'
-            for phoneme in phonemes:
-                phoneme_text = phoneme.get("Phoneme", "")
-                phoneme_score = phoneme.get("PronunciationAssessment", {}).get("AccuracyScore", 0)
-                phoneme_color = get_color(phoneme_score)
-                phoneme_text_color = get_contrast_text_color(phoneme_color)
-                phoneme_html += (
-                    f'<span class="phoneme-item" style="background-color: {phoneme_color}; color: {phoneme_text_color};">'
-                    f"{phoneme_text}</span>"
-                )
-            phoneme_html += "</div>"
+            phoneme_html = "".join(
+                [
+                    '<div class="phoneme-strip">',
+                    *[f"{next_phoneme_open_tag()}{esc(phoneme.get('Phoneme', ''))}</span>" for phoneme in phonemes],
+                    "</div>",
+                ]
+            )
 
         card_style = f"--card-width: {card_min_width}px; --phoneme-count: {phoneme_count};"
-        word_views.append(
-            {
-                "card_html": f'<div class="word-card" style="{card_style}">{header_html}{phoneme_html}</div>',
-                "width": card_min_width,
-                "word_dict": word,
-                "omitted": omitted,
-            }
-        )
-
-    word_cards_html = "".join(view["card_html"] for view in word_views)
-    output += (
-        '<tr class="word-row">'
-        '<td class="word-row-wrapper" colspan="5">'
-        f'<div class="word-card-row">{word_cards_html}</div>'
-        "</td>"
-        "</tr>"
-    )
+        word_card_html = f'<div class="word-card" style="{card_style}">{header_html}{phoneme_html}</div>'
+        if index < visible_words:
+            yield word_card_html
+        else:
+            append_overflow_word_card(word_card_html)
 
-    # Add error-type row
-    def format_error_label(word_dict, omitted_flag):
-        assessment = word_dict.get("PronunciationAssessment", {}) or {}
-        error_type = assessment.get("ErrorType")
-        key = "omission" if omitted_flag else normalize_error_key(error_type)
+        label, bg_color = format_error_label(error_type, omitted)
+        append_error_card(
+            f'<div class="error-card" style="background-color: {bg_color}; width: {card_min_width}px; min-width: {card_min_width}px;">{label}</div>'
+        )
 
-        if key in DISPLAY_ERROR_KEYS:
-            label = ERROR_TYPE_LABELS_JA.get(key, get_error_label_ja(error_type))
-            color = ERROR_ROW_COLOR_MAP.get(key, ERROR_ROW_COLOR_MAP["unknown"])
-            return label, color
+    yield SYLLABLE_TABLE_ROW_CLOSE
+    yield SYLLABLE_TABLE_ERROR_ROW_OPEN
+    yield "".join(error_cards_html[:visible_words])
+    yield SYLLABLE_TABLE_ROW_CLOSE
+    yield "</table>"
+
+    if overflow_word_cards_html:
+        yield (
+            '<details class="word-overflow">'
+            f"<summary>残り{len(overflow_word_cards_html)}語を表示</summary>"
+            '<table class="eval-table">'
+        )
+        yield SYLLABLE_TABLE_WORD_ROW_OPEN
+        yield "".join(overflow_word_cards_html)
+        yield SYLLABLE_TABLE_ROW_CLOSE
+        yield SYLLABLE_TABLE_ERROR_ROW_OPEN
+        yield "".join(error_cards_html[visible_words:])
+        yield SYLLABLE_TABLE_ROW_CLOSE
+        yield "</table></details>"
+    yield "</div>"
 
-        return "&#128077;", "#1f4028"
 
-    error_cards_html = []
-    for view in word_views:
-        label, bg_color = format_error_label(view["word_dict"], view["omitted"])
-        width = view["width"]
-        error_cards_html.append(
-            f'<div class="error-card" style="background-color: {bg_color}; width: {width}px; min-width: {width}px;">{label}</div>'
-        )
+@st.cache_resource
+def _get_pronunciation_config(reference_text):
+    """Create the pronunciation assessment settings once per reference text."""
+    import azure.cognitiveservices.speech as speechsdk
 
-    output += (
-        '<tr class="error-row">'
-        '<td class="error-row-wrapper" colspan="5">'
-        f'<div class="error-card-row">{"".join(error_cards_html)}</div>'
-        "</td>"
-        "</tr>"
+    pronunciation_config = speechsdk.PronunciationAssessmentConfig(
+        reference_text=reference_text,
+        grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+        granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+        enable_miscue=True,
     )
-    
-    output += "</table></div>"
-    return output
+    pronunciation_config.enable_prosody_assessment()
+    pronunciation_config.phoneme_alphabet = "IPA"
+    return pronunciation_config
 
 
-def pronunciation_assessment(audio_file, reference_text):
+def _start_pronunciation_recognition(audio_file, reference_text, audio_bytes=None):
     """
-    Performs pronunciation assessment using Azure Speech SDK.
-    
-    Args:
-        audio_file (str): Path to the audio file to assess
-        reference_text (str): Reference text for pronunciation comparison
-    
+    Start a single-shot pronunciation assessment without waiting for the result.
+    audio_bytes, when given, is the WAV content of audio_file and is streamed
+    to the SDK instead of reopening the file.
+
     Returns:
-        dict: Pronunciation assessment results in JSON format
+        tuple: (speech_recognizer, result_future); the recognizer must be kept
+               alive until result_future.get() returns
     """
+    import azure.cognitiveservices.speech as speechsdk
+
     # Note: Using free tier keys here, but premium keys are used in Avatar
-    speech_key, service_region = (
+    speech_config = get_speech_config(
         st.secrets["Azure_Speech"]["SPEECH_KEY"],
         st.secrets["Azure_Speech"]["SPEECH_REGION"],
     )
-    print(f"SPEECH_KEY: {speech_key}, SPEECH_REGION: {service_region}")
-
-    # Create speech configuration
-    speech_config = speechsdk.SpeechConfig(
-        subscription=speech_key, region=service_region
-    )
-    print("SpeechConfig created successfully")
+    pronunciation_config = _get_pronunciation_config(reference_text)
 
     # Create audio configuration
-    audio_config = speechsdk.audio.AudioConfig(filename=audio_file)
-    print("AudioConfig created successfully")
+    audio_config = build_speech_audio_config(audio_file, audio_bytes)
+    logger.debug("AudioConfig created successfully")
 
-    # Configure pronunciation assessment settings
-    pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-        reference_text=reference_text,
-        grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-        granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-        enable_miscue=True,
+    # Create speech recognizer
+    speech_recognizer = speechsdk.SpeechRecognizer(
+        speech_config=speech_config, audio_config=audio_config
     )
-    pronunciation_config.enable_prosody_assessment()
-    pronunciation_config.phoneme_alphabet = "IPA"
-    print("PronunciationAssessmentConfig created successfully")
+    logger.debug("SpeechRecognizer created successfully")
 
-    try:
-        # Create speech recognizer
-        speech_recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config, audio_config=audio_config
-        )
-        print("SpeechRecognizer created successfully")
+    # Apply pronunciation configuration
+    pronunciation_config.apply_to(speech_recognizer)
+    logger.debug("PronunciationConfig applied successfully")
 
-        # Apply pronunciation configuration
-        pronunciation_config.apply_to(speech_recognizer)
-        print("PronunciationConfig applied successfully")
+    return speech_recognizer, speech_recognizer.recognize_once_async()
 
-        # Perform recognition
-        result = speech_recognizer.recognize_once_async().get()
-        print(f"Recognition result: {result}")
 
-        # Parse JSON result
-        pronunciation_result = json.loads(
-            result.properties.get(speechsdk.PropertyId.SpeechServiceResponse_JsonResult)
-        )
-        print("JSON result parsed successfully")
+def _parse_recognition_result(result):
+    """Decode the pronunciation assessment JSON carried by a recognition result."""
+    import azure.cognitiveservices.speech as speechsdk
+
+    logger.debug("Recognition result: %s", result)
+    pronunciation_result = loads_json(
+        result.properties.get(speechsdk.PropertyId.SpeechServiceResponse_JsonResult)
+    )
+    logger.debug("JSON result parsed successfully")
+    return pronunciation_result
+
 
-        return pronunciation_result
+def pronunciation_assessment(audio_file, reference_text, audio_bytes=None):
+    """
+    Performs pronunciation assessment using Azure Speech SDK.
+    
+    Args:
+        audio_file (str): Path to the audio file to assess
+        reference_text (str): Reference text for pronunciation comparison
+        audio_bytes (bytes, optional): WAV contents of audio_file when already in memory
+    
+    Returns:
+        dict: Pronunciation assessment results in JSON format
+    """
+    try:
+        _, result_future = _start_pronunciation_recognition(audio_file, reference_text, audio_bytes)
+        # Perform recognition
+        return _parse_recognition_result(result_future.get())
     except Exception as e:
         st.error(f"Exception caught in pronunciation_assessment function: {str(e)}")
         import traceback
@@ -623,54 +891,156 @@ def pronunciation_assessment(audio_file, reference_text):
         raise
 
 
+def pronunciation_assessment_many(audio_files, reference_texts):
+    """
+    Performs pronunciation assessment for several audio files concurrently.
+    All recognitions are started before any result is awaited, so the
+    service round-trips overlap instead of running back to back.
+    
+    Args:
+        audio_files (list): Paths to the audio files to assess
+        reference_texts (list): Reference text for each audio file
+    
+    Returns:
+        list: Pronunciation assessment results in JSON format, in input order
+    """
+    try:
+        pending = [
+            _start_pronunciation_recognition(audio_file, reference_text)
+            for audio_file, reference_text in zip(audio_files, reference_texts)
+        ]
+        # The SDK's result futures only expose a blocking get(); draining them in
+        # order still costs roughly the slowest round-trip since all are in flight
+        return [_parse_recognition_result(result_future.get()) for _, result_future in pending]
+    except Exception as e:
+        st.error(f"Exception caught in pronunciation_assessment_many function: {str(e)}")
+        import traceback
+
+        st.error(traceback.format_exc())
+        raise
+
+
+def _score_chart_x_encoding(tick_count):
+    """Attempt axis shared by the score history charts, fixed to attempts 1-6."""
+    return {
+        "field": "Attempt",
+        "type": "quantitative",
+        "axis": {
+            "tickMinStep": 1,
+            "title": "練習回数",
+            "values": list(range(1, 7)),
+            "tickCount": tick_count,
+            "format": "d",
+            "grid": True,
+        },
+        "scale": {"domain": [1, 6]},
+    }
+
+
+# Vega-Lite specs of the score history charts; only data and the y domain vary per call.
+# The interval param bound to scales is what Altair's .interactive() adds.
+SCORE_CHART_ZOOM_PARAMS = [
+    {"name": "score_zoom", "select": {"type": "interval", "encodings": ["x", "y"]}, "bind": "scales"}
+]
+OVERALL_SCORE_CHART_TEMPLATE = {
+    "mark": {"type": "line", "color": "#FF4B4B", "point": True},
+    "encoding": {
+        "x": _score_chart_x_encoding(6),
+        "y": {"field": "PronScore", "type": "quantitative", "title": "スコア"},
+        "tooltip": [
+            {"field": "Attempt", "type": "quantitative"},
+            {"field": "PronScore", "type": "quantitative"},
+        ],
+    },
+    "params": SCORE_CHART_ZOOM_PARAMS,
+    "title": "総合点スコア",
+    "width": "container",
+    "height": 300,
+}
+DETAIL_SCORE_METRICS = ("AccuracyScore", "FluencyScore", "CompletenessScore", "ProsodyScore")
+DETAIL_SCORE_LABELS = {
+    "AccuracyScore": "正確性",
+    "FluencyScore": "流暢性",
+    "CompletenessScore": "完全性",
+    "ProsodyScore": "韻律",
+}
+DETAIL_SCORE_CHART_TEMPLATE = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": _score_chart_x_encoding(7),
+        "y": {"field": "Score", "type": "quantitative", "title": "スコア"},
+        "color": {
+            "field": "Metric",
+            "type": "nominal",
+            "scale": {"range": ["#00C957", "#4169E1", "#FFD700", "#FF69B4"]},
+            "legend": {"title": "評価項目", "orient": "right"},
+        },
+        "tooltip": [
+            {"field": "Attempt", "type": "quantitative"},
+            {"field": "Score", "type": "quantitative"},
+            {"field": "Metric", "type": "nominal"},
+        ],
+    },
+    "params": SCORE_CHART_ZOOM_PARAMS,
+    "title": "詳細スコア",
+    "width": "container",
+    "height": 300,
+}
+
+
+def _scores_history_key(scores_history) -> tuple:
+    """Freeze a {metric: scores} mapping into a hashable ((metric, scores), ...) cache key."""
+    if scores_history is None:
+        return ()
+    return tuple((key, tuple(values)) for key, values in scores_history.items())
+
+
 def plot_overall_score(scores_history: dict):
     """Plot overall pronunciation score"""
-    # Convert dict to DataFrame
+    return _build_overall_score_chart(_scores_history_key(scores_history))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_overall_score_chart(scores_key: tuple):
+    """Build the overall score chart; reruns with unchanged scores hit the cache."""
+    scores_history = dict(scores_key)
     if not scores_history or "PronScore" not in scores_history or not scores_history["PronScore"]:
         # Return empty chart with message if no data
         return alt.Chart(pd.DataFrame()).mark_text(text="まだ学習記録がありません", size=20)
 
-    data = pd.DataFrame(scores_history)
-    data["Attempt"] = range(1, len(data) + 1)
+    pron_scores = scores_history["PronScore"]
+    records = [
+        {"Attempt": attempt, "PronScore": score}
+        for attempt, score in enumerate(pron_scores, start=1)
+    ]
 
     # Calculate y-axis range
-    y_min_pron = max(0, data["PronScore"].min() - 5)
-    y_max_pron = min(100, data["PronScore"].max() + 5)
-
-    chart = (
-        alt.Chart(data)
-        .mark_line(color="#FF4B4B", point=True)
-        .encode(
-            x=alt.X(
-                "Attempt:Q",
-                axis=alt.Axis(
-                    tickMinStep=1,
-                    title="練習回数",
-                    values=list(range(1, 7)),
-                    tickCount=6,
-                    format="d",
-                    grid=True,
-                ),
-                scale=alt.Scale(domain=[1, 6]),
-            ),
-            y=alt.Y(
-                "PronScore:Q",
-                title="スコア",
-                scale=alt.Scale(domain=[y_min_pron, y_max_pron]),
-            ),
-            tooltip=["Attempt", "PronScore"],
-        )
-        .properties(title="総合点スコア", width="container", height=300)
-        .interactive()
-    )
-
-    return chart
+    y_min_pron = max(0, min(pron_scores) - 5)
+    y_max_pron = min(100, max(pron_scores) + 5)
+
+    # Fill the static Vega-Lite template and skip Altair's encode/validate layer
+    encoding = OVERALL_SCORE_CHART_TEMPLATE["encoding"]
+    spec = {
+        **OVERALL_SCORE_CHART_TEMPLATE,
+        "data": {"values": records},
+        "encoding": {
+            **encoding,
+            "y": {**encoding["y"], "scale": {"domain": [y_min_pron, y_max_pron]}},
+        },
+    }
+    return alt.Chart.from_dict(spec, validate=False)
 
 
 def plot_detail_scores(scores_history: dict):
     """Plot detailed scores components"""
-    # Convert dict to DataFrame
-    metrics = ["AccuracyScore", "FluencyScore", "CompletenessScore", "ProsodyScore"]
+    return _build_detail_scores_chart(_scores_history_key(scores_history))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_detail_scores_chart(scores_key: tuple):
+    """Build the detail score chart; reruns with unchanged scores hit the cache."""
+    scores_history = dict(scores_key)
+    metrics = DETAIL_SCORE_METRICS
 
     # Check if data exists
     if not scores_history or not any(
@@ -681,60 +1051,28 @@ def plot_detail_scores(scores_history: dict):
             text="まだ学習記録がありません", size=20
         )
 
-    data = pd.DataFrame(scores_history)
-    data["Attempt"] = range(1, len(data) + 1)
-
-    # Prepare data
-    detail_data = data.melt(
-        id_vars=["Attempt"], value_vars=metrics, var_name="Metric", value_name="Score"
-    )
-    metric_labels = {
-        "AccuracyScore": "正確性",
-        "FluencyScore": "流暢性",
-        "CompletenessScore": "完全性",
-        "ProsodyScore": "韻律",
-    }
-    detail_data["Metric"] = detail_data["Metric"].map(metric_labels).fillna(
-        detail_data["Metric"]
-    )
+    # Prepare long-form records (one per attempt and metric) directly from the lists
+    detail_data = [
+        {"Attempt": attempt, "Metric": DETAIL_SCORE_LABELS[metric], "Score": score}
+        for metric in metrics
+        for attempt, score in enumerate(scores_history.get(metric) or _EMPTY_TUPLE, start=1)
+    ]
+    all_scores = [record["Score"] for record in detail_data]
 
     # Calculate y-axis range
-    y_min_detail = max(0, min(data[metrics].min()) - 5)
-    y_max_detail = min(100, max(data[metrics].max()) + 5)
-
-    chart = (
-        alt.Chart(detail_data)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X(
-                "Attempt:Q",
-                axis=alt.Axis(
-                    tickMinStep=1,
-                    title="練習回数",
-                    values=list(range(1, 7)),
-                    tickCount=7,
-                    format="d",
-                    grid=True,
-                ),
-                scale=alt.Scale(domain=[1, 6]),
-            ),
-            y=alt.Y(
-                "Score:Q",
-                title="スコア",
-                scale=alt.Scale(domain=[y_min_detail, y_max_detail]),
-            ),
-            color=alt.Color(
-                "Metric:N",
-                scale=alt.Scale(range=["#00C957", "#4169E1", "#FFD700", "#FF69B4"]),
-                legend=alt.Legend(title="評価項目", orient="right"),
-            ),
-            tooltip=["Attempt", "Score", "Metric"],
-        )
-        .properties(title="詳細スコア", width="container", height=300)
-        .interactive()
-    )
-
-    return chart
+    y_min_detail = max(0, min(all_scores) - 5)
+    y_max_detail = min(100, max(all_scores) + 5)
+
+    encoding = DETAIL_SCORE_CHART_TEMPLATE["encoding"]
+    spec = {
+        **DETAIL_SCORE_CHART_TEMPLATE,
+        "data": {"values": detail_data},
+        "encoding": {
+            **encoding,
+            "y": {**encoding["y"], "scale": {"domain": [y_min_detail, y_max_detail]}},
+        },
+    }
+    return alt.Chart.from_dict(spec, validate=False)
 
 
 def plot_score_history():
@@ -758,27 +1096,22 @@ def plot_score_history():
         st.warning("まだ学習記録がありません")
         return
 
-    # Ensure all arrays have the same length before creating DataFrame
-    max_length = max(len(v) for v in scores.values() if v)
-    if max_length == 0:
+    # Truncate every non-empty score list to the shortest one so the DataFrame is rectangular
+    lengths = [len(v) for v in scores.values() if v]
+    if not lengths:
         st.warning("まだ学習記録がありません")
         return
+    min_length = min(lengths)
 
-    # Pad shorter arrays with None or use only the minimum length
-    min_length = min(len(v) for v in scores.values() if v)
-
-    # Create a clean scores dict with consistent lengths
-    clean_scores = {}
-    for key, value_list in scores.items():
-        if value_list:  # Only include non-empty lists
-            clean_scores[key] = value_list[:min_length]  # Truncate to minimum length
-
-    if not clean_scores or min_length == 0:
-        st.warning("まだ学習記録がありません")
-        return
+    # Stack the truncated lists into one (attempts x metrics) array for pandas
+    columns = [key for key, value_list in scores.items() if value_list]
+    values = np.array(
+        [list(value_list)[:min_length] for value_list in scores.values() if value_list],
+        dtype=np.float64,
+    ).T
 
     # Create DataFrame only if we have data
-    data = pd.DataFrame(clean_scores)
+    data = pd.DataFrame(values, columns=columns)
     if len(data) == 0:
         st.warning("まだ学習記録がありません")
         return
@@ -798,11 +1131,31 @@ def plot_score_history():
         st.altair_chart(detail_chart, use_container_width=True)
 
 
+def _prepare_matplotlib():
+    """Import matplotlib on first use and apply the radar chart rcParams once."""
+    global _RADAR_READY
+    import matplotlib
+
+    if not _RADAR_READY:
+        matplotlib.rcParams["font.family"] = "MS Gothic"
+        _RADAR_READY = True
+    return matplotlib
+
+
+def radar_projection_name(num_vars, frame="circle"):
+    """Return the projection name registered by radar_factory(num_vars, frame)."""
+    return f"radar_{num_vars}_{frame}"
+
+
+@lru_cache(maxsize=None)
 def radar_factory(num_vars, frame="circle"):
     """
     Create a radar chart with `num_vars` Axes.
 
-    This function creates a RadarAxes projection and registers it.
+    This function creates a RadarAxes projection and registers it under
+    radar_projection_name(num_vars, frame). Results are cached per
+    (num_vars, frame), so each projection class is built and registered
+    exactly once and different shapes never overwrite each other.
 
     Parameters
     ----------
@@ -812,6 +1165,13 @@ def radar_factory(num_vars, frame="circle"):
         Shape of frame surrounding Axes.
 
     """
+    from matplotlib.patches import Circle, RegularPolygon
+    from matplotlib.path import Path
+    from matplotlib.projections import register_projection
+    from matplotlib.projections.polar import PolarAxes
+    from matplotlib.spines import Spine
+    from matplotlib.transforms import Affine2D
+
     # calculate evenly-spaced axis angles
     theta = np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
 
@@ -827,7 +1187,7 @@ def radar_factory(num_vars, frame="circle"):
 
     class RadarAxes(PolarAxes):
 
-        name = "radar"
+        name = radar_projection_name(num_vars, frame)
         PolarTransform = RadarTransform
 
         def __init__(self, *args, **kwargs):
@@ -844,6 +1204,7 @@ def radar_factory(num_vars, frame="circle"):
             lines = super().plot(*args, **kwargs)
             for line in lines:
                 self._close_line(line)
+            return lines
 
         def _close_line(self, line):
             x, y = line.get_data()
@@ -883,6 +1244,57 @@ def radar_factory(num_vars, frame="circle"):
     return theta
 
 
+RADAR_CATEGORIES = {
+    "総合": "PronScore",
+    "正確性": "AccuracyScore",
+    "流暢性": "FluencyScore",
+    "完全性": "CompletenessScore",
+    "韻律": "ProsodyScore",
+}
+
+# Radar shape derived from RADAR_CATEGORIES once; every chart uses this fixed pentagon
+RADAR_NUM_VARS = len(RADAR_CATEGORIES)
+RADAR_LABELS = tuple(RADAR_CATEGORIES)
+RADAR_SCORE_KEYS = tuple(RADAR_CATEGORIES.values())
+
+# Radial offset of each score label from its vertex, in RADAR_CATEGORIES order.
+# Labels sit FULLY INSIDE the pentagon; the top label (総合) sits deeper.
+RADAR_LABEL_OFFSETS = np.array([-0.18] + [-0.16] * (RADAR_NUM_VARS - 1))
+RADAR_LABEL_MIN_RADIUS = 0.20
+
+# Static radar geometry, computed once instead of on every draw
+RADAR_GRID_LEVELS = np.linspace(0.2, 1.0, 5)
+RADAR_GRID_LABELS = [f"{int(level * 100)}" for level in RADAR_GRID_LEVELS]
+RADAR_REFERENCE_LEVEL = 0.6
+RADAR_REFERENCE_VALUES = np.full(RADAR_NUM_VARS, RADAR_REFERENCE_LEVEL)
+
+# Fixed figure styling, applied while the Figure/Axes are constructed instead of
+# through per-call setters; scoped with rc_context so global rcParams stay untouched
+RADAR_STYLE_RC = {
+    "figure.facecolor": "#0E1117",
+    "axes.facecolor": "#0E1117",
+    "axes.edgecolor": "white",  # polar spine
+    "axes.linewidth": 1.5,
+}
+
+# Shared by every score label; Matplotlib copies bbox props rather than mutating them
+RADAR_SCORE_BBOX = {
+    "boxstyle": "round,pad=0.3",  # Slightly reduced padding
+    "facecolor": "#1E88E5",
+    "edgecolor": "white",
+    "linewidth": 1.5,  # Slightly thinner border
+}
+
+
+def get_radar_scores(pronunciation_result, assessed=None) -> tuple:
+    """Return the overall scores normalized to the 0-1 range, in RADAR_CATEGORIES order."""
+    if assessed is not None:
+        overall_assessment = assessed.overall
+    else:
+        overall_assessment = pronunciation_result["NBest"][0]["PronunciationAssessment"]
+    return tuple(overall_assessment.get(key, 0) / 100.0 for key in RADAR_SCORE_KEYS)
+
+
 def create_radar_chart(pronunciation_result):
     """
     Creates an enhanced pentagon radar chart for pronunciation assessment visualization.
@@ -892,41 +1304,115 @@ def create_radar_chart(pronunciation_result):
         pronunciation_result (dict): Dictionary containing pronunciation assessment data
 
     Returns:
-        matplotlib.figure.Figure: The generated radar chart
+        matplotlib.figure.Figure: The generated radar chart. It is not tracked by
+                                  pyplot, so dropping the reference frees it.
     """
-    # Extract overall assessment
-    overall_assessment = pronunciation_result["NBest"][0]["PronunciationAssessment"]
-
-    # Define categories with Japanese labels
-    categories = {
-        "総合": "PronScore",
-        "正確性": "AccuracyScore",
-        "流暢性": "FluencyScore",
-        "完全性": "CompletenessScore",
-        "韻律": "ProsodyScore",
-    }
+    fig, ax = _new_radar_figure()
+    _draw_radar_chart(get_radar_scores(pronunciation_result), fig, ax)
+    return fig
 
-    # Get scores (normalize to 0-1 range for radar chart)
-    scores = [overall_assessment.get(categories[cat], 0) / 100.0 for cat in categories]
-    labels = list(categories.keys())
 
-    # Number of variables
-    N = len(categories)
+def create_radar_chart_png(pronunciation_result, assessed=None) -> bytes:
+    """
+    Renders the radar chart for a pronunciation assessment to PNG bytes.
+    Identical scores are served from cache instead of redrawing the figure.
 
-    # Create radar chart with pentagon frame
-    theta = radar_factory(N, frame="polygon")
+    Args:
+        pronunciation_result (dict): Dictionary containing pronunciation assessment data
+        assessed (AssessedUtterance, optional): Pre-parsed pronunciation_result
+
+    Returns:
+        bytes: PNG image of the radar chart, ready for st.image
+    """
+    return render_radar_chart_png(get_radar_scores(pronunciation_result, assessed))
+
+
+# The PNG renderer shares one radar skeleton; the lock serializes access
+# because Streamlit runs each session in its own thread
+_RADAR_SKELETON_LOCK = threading.Lock()
+
+
+@st.cache_data(show_spinner=False)
+def render_radar_chart_png(scores: tuple) -> bytes:
+    """Draw the radar chart for normalized scores and encode it as PNG."""
+    buffer = io.BytesIO()
+    with _RADAR_SKELETON_LOCK:
+        fig, theta, score_line, score_fill, score_texts = _get_radar_skeleton()
+        _update_radar_scores(theta, scores, score_line, score_fill, score_texts)
+        # match st.pyplot's defaults so the image looks the same as before
+        fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_radar_skeleton():
+    """
+    Build the radar chart once and return the artists that depend on the scores.
+
+    Returns:
+        tuple: (fig, theta, score_line, score_fill, score_texts); everything else
+               on the figure (frame, grid, reference pentagon, labels) is static
+    """
+    fig, ax = _new_radar_figure()
+    return (fig, *_draw_radar_chart(np.zeros(RADAR_NUM_VARS), fig, ax))
 
-    # Create figure and keep the plotting area square so grid spacing stays uniform
-    fig, ax = plt.subplots(figsize=(6.0, 4.0), subplot_kw=dict(projection="radar"))
+
+def _update_radar_scores(theta, scores, score_line, score_fill, score_texts):
+    """Move the score line, fill and labels of a radar skeleton to new scores in place."""
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    score_line.set_data(np.append(theta, theta[0]), np.append(scores, scores[0]))
+    score_fill.set_xy(np.column_stack((theta, scores)))
+    for text, angle, (y, label) in zip(score_texts, theta, _radar_score_labels(scores)):
+        text.set_position((angle, y))
+        text.set_text(label)
+
+
+def _radar_score_labels(scores):
+    """Return (y, text) for each score label, placed inside the pentagon."""
+    scores = np.asarray(scores, dtype=float)
+    # Calculate positions INSIDE the pentagon, keeping a minimum distance from center
+    label_ys = np.maximum(RADAR_LABEL_MIN_RADIUS, scores + RADAR_LABEL_OFFSETS)
+    # Convert back to 0-100 scale for display
+    return [(y, f"{score:.0f}") for y, score in zip(label_ys.tolist(), (scores * 100).tolist())]
+
+
+def _new_radar_figure():
+    """Create an empty radar chart Figure and its pentagon-framed RadarAxes."""
+    matplotlib = _prepare_matplotlib()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Create radar chart with pentagon frame
+    radar_factory(RADAR_NUM_VARS, frame="polygon")
+
+    # Create figure and keep the plotting area square so grid spacing stays uniform.
+    # Figure is built without pyplot so it is never held by pyplot's figure manager;
+    # its Agg canvas is attached up front so savefig never has to swap canvases.
+    with matplotlib.rc_context(RADAR_STYLE_RC):
+        fig = Figure(figsize=(6.0, 4.0))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(projection=radar_projection_name(RADAR_NUM_VARS, frame="polygon"))
     fig.subplots_adjust(top=0.92, bottom=0.08, left=0.12, right=0.88)
+    return fig, ax
+
+
+def _draw_radar_chart(scores, fig, ax):
+    """
+    Draw the radar chart for scores normalized to 0-1 onto an empty fig/ax.
+
+    Returns:
+        tuple: (theta, score_line, score_fill, score_texts) for in-place updates
+    """
+    # One contiguous float64 array (Matplotlib's working dtype) shared by plot, fill and labels
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    theta = radar_factory(RADAR_NUM_VARS, frame="polygon")
+
     ax.set_aspect("equal", adjustable="box")
 
     # Configure evenly spaced radial gridlines and hide numeric labels
-    grid_levels = np.linspace(0.2, 1.0, 5)
-    grid_labels = [f"{int(level * 100)}" for level in grid_levels]
     ax.set_rgrids(
-        grid_levels,
-        labels=grid_labels,
+        RADAR_GRID_LEVELS,
+        labels=RADAR_GRID_LABELS,
         angle=0,
         fontsize=7,
         color="white",
@@ -935,8 +1421,7 @@ def create_radar_chart(pronunciation_result):
     ax.yaxis.grid(True, linestyle="--", linewidth=0.8, color="white", alpha=0.25)
 
     # Add inner dashed pentagon for reference (e.g., at 60% level)
-    reference_level = 0.6
-    reference_values = [reference_level] * N
+    reference_values = RADAR_REFERENCE_VALUES
     ax.plot(
         theta,
         reference_values,
@@ -948,7 +1433,7 @@ def create_radar_chart(pronunciation_result):
     ax.fill(theta, reference_values, alpha=0.05, color="white")
 
     # Plot the actual scores
-    ax.plot(
+    score_line, = ax.plot(
         theta,
         scores,
         "o-",
@@ -959,10 +1444,10 @@ def create_radar_chart(pronunciation_result):
         markeredgecolor="white",
         markeredgewidth=0.7,
     )
-    ax.fill(theta, scores, alpha=0.25, color="#1E88E5")
+    score_fill, = ax.fill(theta, scores, alpha=0.25, color="#1E88E5")
 
     # Set labels with WHITE color (reduced font size)
-    ax.set_varlabels(labels)
+    ax.set_varlabels(RADAR_LABELS)
     # Set label font size and color
     for label in ax.get_xticklabels():
         label.set_fontsize(12)  # Reduced from 16
@@ -970,60 +1455,47 @@ def create_radar_chart(pronunciation_result):
         label.set_color("white")
 
     # Add score values INSIDE the pentagon with smart positioning to avoid overlap
-    for idx, (angle, score, label) in enumerate(zip(theta, scores, labels)):
-        actual_score = score * 100  # Convert back to 0-100 scale
-
-        # Position scores FULLY INSIDE the pentagon - deeper negative offsets
-        if idx == 0:  # 総合 (top)
-            offset = -0.18
-            va = "center"
-        elif idx == 1:  # 正確性 (top-right)
-            offset = -0.16
-            va = "center"
-        elif idx == 2:  # 流暢性 (bottom-right)
-            offset = -0.16
-            va = "center"
-        elif idx == 3:  # 完全性 (bottom-left)
-            offset = -0.16
-            va = "center"
-        else:  # 韻律 (top-left)
-            offset = -0.16
-            va = "center"
-
-        # Calculate position INSIDE the pentagon with better constraint
-        x = angle
-        y = max(0.20, score + offset)  # Increased minimum distance from center
-
-        ax.text(
-            x,
+    score_texts = []
+    for angle, (y, label) in zip(theta, _radar_score_labels(scores)):
+        score_text = ax.text(
+            angle,
             y,
-            f"{actual_score:.0f}",
+            label,
             ha="center",
-            va=va,
+            va="center",
             fontsize=9,  # Reduced from 12
             fontweight="bold",
             color="white",
-            bbox=dict(
-                boxstyle="round,pad=0.3",  # Slightly reduced padding
-                facecolor="#1E88E5",
-                edgecolor="white",
-                linewidth=1.5,  # Slightly thinner border
-            ),
+            bbox=RADAR_SCORE_BBOX,
             transform=ax.transData,
             zorder=10,
         )
-    # Style improvements - Light gray background
-    ax.set_facecolor("#0E1117")
-    fig.patch.set_facecolor("#0E1117")
-
+        score_texts.append(score_text)
+    # Background and spine colors come from RADAR_STYLE_RC in _new_radar_figure
     # Customize grid appearance
     ax.grid(True, linestyle="--", alpha=0.3, linewidth=1, color="#CCCCCC")
 
-    # Set spine color
-    ax.spines['polar'].set_edgecolor('white')
-    ax.spines['polar'].set_linewidth(1.5)
-
-    return fig
+    return theta, score_line, score_fill, score_texts
+
+
+# Vega-Lite spec of the error doughnut; only data, color scale and title vary per call
+DOUGHNUT_CHART_TEMPLATE = {
+    "mark": {"type": "arc", "innerRadius": 50},
+    "encoding": {
+        "theta": {"field": "Count", "type": "quantitative"},
+        "color": {
+            "field": "Label",
+            "type": "nominal",
+            "legend": {"title": "エラータイプ"},
+        },
+        "tooltip": [
+            {"field": "Label", "type": "nominal", "title": "エラータイプ"},
+            {"field": "Count", "type": "quantitative", "title": "件数"},
+        ],
+    },
+    "width": 300,
+    "height": 300,
+}
 
 
 def create_doughnut_chart(data: dict, title: str):
@@ -1040,125 +1512,105 @@ def create_doughnut_chart(data: dict, title: str):
         Altair chart object
     """
     # Convert list values to counts if necessary, restricting to displayable error types
-    processed_counts = {}
+    processed_counts = Counter()
     for key, value in data.items():
         normalized = normalize_error_key(key)
-        if normalized not in DISPLAY_ERROR_KEYS:
-            continue
-
-        if isinstance(value, list):
-            count = len(value)
-        elif isinstance(value, (int, float)):
-            count = value
-        else:
-            continue
-
-        if count > 0:
-            processed_counts[normalized] = processed_counts.get(normalized, 0) + count
+        if normalized in DISPLAY_ERROR_KEYS:
+            count = len(value) if isinstance(value, list) else value if isinstance(value, (int, float)) else 0
+            if count > 0:
+                processed_counts[normalized] += count
     
     # Check if data is empty
     if not processed_counts:
-        return alt.Chart(pd.DataFrame()).mark_text(
-            text="エラーはありません",
-            size=20,
-            color="green"
-        ).properties(title=title, width=300, height=300)
+        return _empty_doughnut_chart(title)
     
     records = [
-        {
-            "Key": key,
-            "Label": ERROR_TYPE_LABELS_JA.get(key, key.title()),
-            "Count": processed_counts.get(key, 0),
-        }
-        for key in ERROR_CHART_ORDER
+        {"Key": key, "Label": label, "Count": processed_counts[key]}
+        for key, label in ERROR_CHART_KEYS_LABELS
     ]
 
-    if not records:
-        return alt.Chart(pd.DataFrame()).mark_text(
-            text="エラーはありません",
-            size=20,
-            color="green"
-        ).properties(title=title, width=300, height=300)
+    # Fill the static Vega-Lite template and skip Altair's per-call encode/validate layer
+    encoding = DOUGHNUT_CHART_TEMPLATE["encoding"]
+    spec = {
+        **DOUGHNUT_CHART_TEMPLATE,
+        "data": {"values": records},
+        "encoding": {
+            **encoding,
+            "color": {**encoding["color"], "scale": ERROR_CHART_COLOR_SCALE},
+        },
+        "title": title,
+    }
+    return alt.Chart.from_dict(spec, validate=False)
+
+@lru_cache(maxsize=8)
+def _empty_doughnut_chart(title: str):
+    """Return the "no errors" placeholder chart; built once per title and shared."""
+    return alt.Chart(alt.Data(values=[])).mark_text(
+        text="エラーはありません",
+        size=20,
+        color="green"
+    ).properties(title=title, width=300, height=300)
+
+
+# Score keys shown as metric cards, with their Japanese captions
+METRIC_CARD_LABELS = {
+    "PronScore": "総合スコア",
+    "AccuracyScore": "正確性",
+    "FluencyScore": "流暢性",
+    "CompletenessScore": "完全性",
+    "ProsodyScore": "韻律",
+}
 
-    df = pd.DataFrame(records)
-    
-    color_domain = [record["Label"] for record in records]
-    color_range = [ERROR_CHART_COLOR_MAP.get(record["Key"], "#6b7280") for record in records]
-
-    chart = (
-        alt.Chart(df)
-        .mark_arc(innerRadius=50)
-        .encode(
-            theta=alt.Theta(field="Count", type="quantitative"),
-            color=alt.Color(
-                field="Label",
-                type="nominal",
-                scale=alt.Scale(domain=color_domain, range=color_range),
-                legend=alt.Legend(title="エラータイプ"),
-            ),
-            tooltip=[
-                alt.Tooltip("Label:N", title="エラータイプ"),
-                alt.Tooltip("Count:Q", title="件数"),
-            ],
-        )
-        .properties(title=title, width=300, height=300)
-    )
-    
-    return chart
 
 def _get_metric_value(scores_history: dict, key: str, decimals: int = 1):
     """Return the latest value and delta rounded to the desired decimals."""
-    values = scores_history.get(key, [])
-    if not values:
+    # tuple() first: history lists are deques in session state, which do not slice
+    values = tuple(scores_history.get(key) or _EMPTY_TUPLE)
+    return _round_metric(values[-2:], decimals)
+
+
+@lru_cache(maxsize=64)
+def _round_metric(last_values: tuple, decimals: int):
+    """Round the latest value and its delta from the one before it (if any)."""
+    if not last_values:
         return 0.0, None
 
-    latest = round(values[-1], decimals)
+    latest = round(last_values[-1], decimals)
     delta = None
-    if len(values) > 1:
-        delta = round(values[-1] - values[-2], decimals)
+    if len(last_values) > 1:
+        delta = round(last_values[-1] - last_values[-2], decimals)
     return latest, delta
 
 
+def _get_all_metrics(scores_history: dict, decimals: int = 1) -> dict:
+    """Return {key: (latest, delta)} for every METRIC_CARD_LABELS key in one pass."""
+    return {key: _get_metric_value(scores_history, key, decimals) for key in METRIC_CARD_LABELS}
+
+
 def create_metric_cards(practice_times: int, scores_history: dict):
     metric_card_cols = st.columns(5)
-    if practice_times <= 1:
-        pron_value, _ = _get_metric_value(scores_history, "PronScore")
-        acc_value, _ = _get_metric_value(scores_history, "AccuracyScore")
-        flu_value, _ = _get_metric_value(scores_history, "FluencyScore")
-        comp_value, _ = _get_metric_value(scores_history, "CompletenessScore")
-        pros_value, _ = _get_metric_value(scores_history, "ProsodyScore")
-
-        metric_card_cols[0].metric("総合スコア", pron_value)
-        metric_card_cols[1].metric("正確性", acc_value)
-        metric_card_cols[2].metric("流暢性", flu_value)
-        metric_card_cols[3].metric("完全性", comp_value)
-        metric_card_cols[4].metric("韻律", pros_value)
-    else:
-        pron_value, pron_delta = _get_metric_value(scores_history, "PronScore")
-        acc_value, acc_delta = _get_metric_value(scores_history, "AccuracyScore")
-        flu_value, flu_delta = _get_metric_value(scores_history, "FluencyScore")
-        comp_value, comp_delta = _get_metric_value(scores_history, "CompletenessScore")
-        pros_value, pros_delta = _get_metric_value(scores_history, "ProsodyScore")
-
-        metric_card_cols[0].metric("総合スコア", pron_value, delta=pron_delta)
-        metric_card_cols[1].metric("正確性", acc_value, delta=acc_delta)
-        metric_card_cols[2].metric("流暢性", flu_value, delta=flu_delta)
-        metric_card_cols[3].metric("完全性", comp_value, delta=comp_delta)
-        metric_card_cols[4].metric("韻律", pros_value, delta=pros_delta)
+    metrics = _get_all_metrics(scores_history)
+    for col, (key, label) in zip(metric_card_cols, METRIC_CARD_LABELS.items()):
+        value, delta = metrics[key]
+        # st.metric renders no delta badge for None, so the first attempt needs no branch
+        col.metric(label, value, delta=delta if practice_times > 1 else None)
+
+TEST_HISTORY_PATH = "asset/1/history/レッソン2-2024-12-24_16-43-01.json"
+
+
+@st.cache_data(show_spinner=False)
+def _load_test_history(path):
+    """Read a saved assessment result once per process for the manual test helpers."""
+    return load_json_file(path)
+
 
 def test_radar_chart():
-    with open(
-        "asset/1/history/レッソン2-2024-12-24_16-43-01.json", "r", encoding="utf-8"
-    ) as f:
-        result = json.load(f)
+    result = _load_test_history(TEST_HISTORY_PATH)
     fig1 = create_radar_chart(result)
     fig1.savefig("radar_chart.png")
 
 
 def test_syllable_table():
-    with open(
-        "asset/1/history/レッソン2-2024-12-24_16-43-01.json", "r", encoding="utf-8"
-    ) as f:
-        result = json.load(f)
+    result = _load_test_history(TEST_HISTORY_PATH)
     html_table = create_syllable_table(result)
     st.html(html_table)
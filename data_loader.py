@@ -1,20 +1,72 @@
 import streamlit as st
-import json
+import os
+import warnings
+from collections import deque
+from functools import wraps
+from itertools import zip_longest
+from pathlib import Path
 from typing import Optional
-from tools import has_pronunciation_errors
+from tools import dumps_json_pretty, load_json_file
+
+LEARNING_DATABASE_DIR = Path("assets/learning_database")
+PARTICIPANT_SENTENCE_ORDER_PATH = "assets/participant_sentence_order.json"
+# Only the most recent feedback lines are ever used, so older ones are not kept in memory
+AI_HISTORY_MAX_LINES = 40
+# Bytes read from the end of the history file to find those lines
+AI_HISTORY_TAIL_BYTES = 64 * 1024
+# Avatar video order per lesson for odd and even user IDs
+ODD_USER_AVATAR_ORDER = (1, 2, 3, 4)
+EVEN_USER_AVATAR_ORDER = (1, 3, 2, 4)
+# Fill value for metrics with fewer attempts than the longest one in the summary timeline
+_NO_SCORE = object()
+
+# Static prompt bodies; only the {placeholder} slots are filled per request
+USER_PROMPT_TEMPLATE = (
+    "あなたは system prompt で定義された「英語発音改善アシスタント」です。"
+    "以下の構造化データを使って、必須要素（太字の単語再提示／音素別アドバイス／ミニ練習指示／励ましの締め）を"
+    "Markdown 3〜6 行で日本語（です・ます調）出力してください。\n"
+    "### 入力データ\n"
+    "- 練習文: {sentence}\n"
+    "- 低スコア語の詳細(JSON):\n"
+    "```json\n"
+    "{payload}\n"
+    "```\n"
+    "### 執筆ルール\n"
+    "1. JSONの `word` と `phonemes` の `phoneme`/`score` を上から順に参照し、最大2音素まで扱う。\n"
+    "2. `status` が `no_detected_errors` の場合は「今回は誤りなし」と祝福し、復習アイデアを1つ返す。\n"
+    "3. 専門用語は必要最低限、例えは日本語ネイティブに分かる体感描写を1つ含める。\n"
+    "4. 画像や外部資料への誘導は禁止、文章だけで完結させる。\n"
+)
+
+SUMMARY_PROMPT_TEMPLATE = (
+    "あなたは system prompt で定義された「学習者の発音成績サマライザー」です。"
+    "以下の JSON データだけを根拠に、Score Snapshot / Progress Insights / Encouragement の3段落を日本語敬体で作成してください。"
+    "1レッスンあたり最大5回の練習が行われます。今回は"
+    "{attempt_count}回の記録があります。\n"
+    "### 参照データ(JSON)\n"
+    "```json\n"
+    "{payload}\n"
+    "```\n"
+    "### 執筆ルール\n"
+    "1. Score Snapshot: 最新 practice_index の overall / Accuracy / Fluency / Completeness / Prosody から有意な指標を選び、具体的な得点と最高値を紹介する。\n"
+    "2. Progress Insights: `scores_timeline` が2件以上なら最初と最新、または直近2回の差分を整数（必要なら1桁小数）で記述し、上下動の要因は推測せずにデータだけで述べる。1件のみでも「初回記録として〜」と肯定的に説明し、「データ不足」という表現は使わない。\n"
+    "3. Encouragement: `errors_summary` の多い順に最大1件触れつつ、今回の頑張りや次回への期待を励ましの言葉で締める。練習法や指示は書かない。\n"
+    "4. `scores_timeline` が空のときのみ「記録がまだありません」と述べ、それ以外では数値に必ず触れる。\n"
+)
+
+@st.cache_data
+def load_participant_sentence_orders() -> dict:
+    """Parse the sentence order of every participant once; keys are user IDs as strings."""
+    return load_json_file(PARTICIPANT_SENTENCE_ORDER_PATH)
 
 @st.cache_data
 def load_participant_sentence_order(user: int) -> list:
     """Load participant sentence order from JSON file."""
-    with open("assets/participant_sentence_order.json", "r", encoding="utf-8") as f:
-        participant_sentence_order = json.load(f)
-    return participant_sentence_order.get(str(user), [])
+    return load_participant_sentence_orders().get(str(user), [])
 
-def determine_avatar_order(user: int) -> list:
+def determine_avatar_order(user: int) -> tuple:
     """Determine avatar order based on user ID."""
-    if user % 2 == 1:
-        return [1, 2, 3, 4]
-    return [1, 3, 2, 4]
+    return ODD_USER_AVATAR_ORDER if user % 2 == 1 else EVEN_USER_AVATAR_ORDER
 
 @st.cache_data
 def load_video(sentence_order: list, user: int, lesson: int):
@@ -23,33 +75,63 @@ def load_video(sentence_order: list, user: int, lesson: int):
     video_path = f"assets/learning_database/{sentence_order[lesson-1]}-{avatar_order[lesson-1]}.mp4"
     st.video(video_path)
 
+@st.cache_data
+def load_lesson_texts() -> dict:
+    """Read every sentence text in the learning database once, keyed by sentence ID."""
+    return {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in LEARNING_DATABASE_DIR.glob("*.txt")
+    }
+
 @st.cache_data
 def load_text(sentence_order: list, lesson: int):
     """Load text file content based on user and lesson."""
-    txt = ""
-    with open(f"assets/learning_database/{sentence_order[lesson-1]}.txt", "r", encoding="utf-8") as f:
-        txt = f.read()
+    sentence_id = sentence_order[lesson-1]
+    txt = load_lesson_texts().get(sentence_id)
+    if txt is None:
+        # Not in the prewarmed set (e.g. added after startup); read it directly
+        txt = (LEARNING_DATABASE_DIR / f"{sentence_id}.txt").read_text(encoding="utf-8")
     st.html(f"<h2 style='text-align: center; color: white;'>{txt}</h2>")
     return txt
 
-@DeprecationWarning
+def _deprecated(func):
+    """Mark func as deprecated: it still works but warns its callers."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        warnings.warn(f"{func.__name__} is deprecated", DeprecationWarning, stacklevel=2)
+        return func(*args, **kwargs)
+    return wrapper
+
+@_deprecated
 def load_ai_history(user:int, lesson:int):
-    """Load AI feedback history for the user."""
+    """Load the most recent AI feedback history lines for the user."""
     history = []
+    history_path = f"assets/{user}/ai_feedback/history.txt"
     try:
-        with open(f"assets/{user}/ai_feedback/history.txt", "r", encoding="utf-8") as f:
-            history = f.readlines()
+        history = _read_history_tail(history_path, os.path.getmtime(history_path))
     except FileNotFoundError:
         st.warning("No AI feedback history found.")
     return history
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _read_history_tail(history_path: str, mtime: float) -> list:
+    """Return the last AI_HISTORY_MAX_LINES lines; mtime keys the cache so appends invalidate it."""
+    # Seek near the end so the read cost stays constant however long the file grows
+    with open(history_path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - AI_HISTORY_TAIL_BYTES)
+        f.seek(start)
+        tail = f.read()
+    lines = tail.decode("utf-8", errors="replace").splitlines(keepends=True)
+    if start > 0 and lines:
+        # The first line was cut by the seek
+        lines = lines[1:]
+    return lines[-AI_HISTORY_MAX_LINES:]
+
 @st.cache_data
 def load_system_prompt(file_path: str = "system_prompt.txt"):
     """Load system prompt from file."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        system_prompt = f.read()
-    
-    return system_prompt
+    return Path(file_path).read_text(encoding="utf-8")
 
 def update_user_prompt(sentence, lowest_word_phonemes: dict, errors_dict: Optional[dict] = None):
     """
@@ -61,13 +143,13 @@ def update_user_prompt(sentence, lowest_word_phonemes: dict, errors_dict: Option
     congratulates the learner incorrectly.
     """
     sentence_text = (sentence or "").strip()
-    errors_dict = errors_dict or {}
+    # Word-level errors with any entries; its truthiness doubles as the "has errors" check
+    condensed_errors = {
+        key: value for key, value in (errors_dict or {}).items() if value
+    }
     if lowest_word_phonemes:
         phoneme_payload = lowest_word_phonemes
-    elif has_pronunciation_errors(errors_dict):
-        condensed_errors = {
-            key: value for key, value in errors_dict.items() if value
-        }
+    elif condensed_errors:
         phoneme_payload = {
             "status": "word_errors_detected",
             "error_summary": condensed_errors,
@@ -78,23 +160,10 @@ def update_user_prompt(sentence, lowest_word_phonemes: dict, errors_dict: Option
             "status": "no_detected_errors",
             "note": "音素エラーは検出されていません",
         }
-    phoneme_payload_json = json.dumps(phoneme_payload, ensure_ascii=False, indent=2)
-
-    user_prompt = (
-        "あなたは system prompt で定義された「英語発音改善アシスタント」です。"
-        "以下の構造化データを使って、必須要素（太字の単語再提示／音素別アドバイス／ミニ練習指示／励ましの締め）を"
-        "Markdown 3〜6 行で日本語（です・ます調）出力してください。\n"
-        "### 入力データ\n"
-        f"- 練習文: {sentence_text or '（空）'}\n"
-        "- 低スコア語の詳細(JSON):\n"
-        "```json\n"
-        f"{phoneme_payload_json}\n"
-        "```\n"
-        "### 執筆ルール\n"
-        "1. JSONの `word` と `phonemes` の `phoneme`/`score` を上から順に参照し、最大2音素まで扱う。\n"
-        "2. `status` が `no_detected_errors` の場合は「今回は誤りなし」と祝福し、復習アイデアを1つ返す。\n"
-        "3. 専門用語は必要最低限、例えは日本語ネイティブに分かる体感描写を1つ含める。\n"
-        "4. 画像や外部資料への誘導は禁止、文章だけで完結させる。\n"
+    phoneme_payload_json = dumps_json_pretty(phoneme_payload)
+
+    user_prompt = USER_PROMPT_TEMPLATE.format(
+        sentence=sentence_text or "（空）", payload=phoneme_payload_json
     )
     return user_prompt
 
@@ -103,42 +172,30 @@ def update_summary_prompt(scores_history, errors_history):
     scores_history = scores_history or {}
     errors_history = errors_history or {}
 
-    max_attempts = max(
-        (len(values) for values in scores_history.values() if isinstance(values, list)),
-        default=0,
-    )
-    scores_timeline = []
-    for idx in range(max_attempts):
-        entry = {"practice_index": idx + 1}
-        for metric, values in scores_history.items():
-            if isinstance(values, list) and idx < len(values):
-                entry[metric] = values[idx]
-        scores_timeline.append(entry)
+    score_columns = {
+        metric: values
+        for metric, values in scores_history.items()
+        if isinstance(values, (list, deque))
+    }
+    # One row per attempt across all metrics; shorter metrics are padded and skipped
+    scores_timeline = [
+        {
+            "practice_index": idx,
+            **{metric: score for metric, score in zip(score_columns, row) if score is not _NO_SCORE},
+        }
+        for idx, row in enumerate(zip_longest(*score_columns.values(), fillvalue=_NO_SCORE), start=1)
+    ]
 
     errors_summary = [
         {"error_type": key, "count": value} for key, value in errors_history.items()
     ]
 
     attempt_count = len(scores_timeline)
-    structured_summary_json = json.dumps(
-        {"scores_timeline": scores_timeline, "errors_summary": errors_summary},
-        ensure_ascii=False,
-        indent=2,
+    structured_summary_json = dumps_json_pretty(
+        {"scores_timeline": scores_timeline, "errors_summary": errors_summary}
     )
 
-    summary_prompt = (
-        "あなたは system prompt で定義された「学習者の発音成績サマライザー」です。"
-        "以下の JSON データだけを根拠に、Score Snapshot / Progress Insights / Encouragement の3段落を日本語敬体で作成してください。"
-        "1レッスンあたり最大5回の練習が行われます。今回は"
-        f"{attempt_count}回の記録があります。\n"
-        "### 参照データ(JSON)\n"
-        "```json\n"
-        f"{structured_summary_json}\n"
-        "```\n"
-        "### 執筆ルール\n"
-        "1. Score Snapshot: 最新 practice_index の overall / Accuracy / Fluency / Completeness / Prosody から有意な指標を選び、具体的な得点と最高値を紹介する。\n"
-        "2. Progress Insights: `scores_timeline` が2件以上なら最初と最新、または直近2回の差分を整数（必要なら1桁小数）で記述し、上下動の要因は推測せずにデータだけで述べる。1件のみでも「初回記録として〜」と肯定的に説明し、「データ不足」という表現は使わない。\n"
-        "3. Encouragement: `errors_summary` の多い順に最大1件触れつつ、今回の頑張りや次回への期待を励ましの言葉で締める。練習法や指示は書かない。\n"
-        "4. `scores_timeline` が空のときのみ「記録がまだありません」と述べ、それ以外では数値に必ず触れる。\n"
+    summary_prompt = SUMMARY_PROMPT_TEMPLATE.format(
+        attempt_count=attempt_count, payload=structured_summary_json
     )
     return summary_prompt
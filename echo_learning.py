@@ -1,7 +1,6 @@
 import io
 import os
 import json
-import librosa
 import time
 import numpy as np
 import pandas as pd
@@ -17,6 +16,7 @@ import traceback
 from streamlit_extras.let_it_rain import rain
 import altair as alt
 from ai_chat import AIChat
+from audio_process import load_waveform_for_plot
 
 import sys
 import os
@@ -119,7 +119,7 @@ def create_radar_chart(pronunciation_result):
     return fig
 
 def create_waveform_plot(audio_file, pronunciation_result):
-    y, sr = librosa.load(audio_file)
+    y, sr = load_waveform_for_plot(audio_file)
     duration = len(y) / sr
 
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -1,8 +1,13 @@
+from collections import deque
 import streamlit as st
 from openai import AzureOpenAI
 import azure.cognitiveservices.speech as speechsdk
 from data_loader import load_system_prompt, load_participant_sentence_order
 
+# Attempts kept per score; matches the 1-6 attempt axis of the score charts
+SCORES_HISTORY_MAXLEN = 6
+SCORES_HISTORY_KEYS = ("PronScore", "AccuracyScore", "FluencyScore", "CompletenessScore", "ProsodyScore")
+
 
 def reset_page_padding():
     """Reset the default padding of the Streamlit page and set layout to wide."""
@@ -70,11 +75,7 @@ def initialize_session_state(session_state, user:int, lesson: int):
         session_state.practice_times = 0
     if "scores_history" not in session_state:
         session_state.scores_history = {
-            "PronScore": [],
-            "AccuracyScore": [],
-            "FluencyScore": [],
-            "CompletenessScore": [],
-            "ProsodyScore": []
+            key: deque(maxlen=SCORES_HISTORY_MAXLEN) for key in SCORES_HISTORY_KEYS
         }
     if "errors_history" not in session_state:
         session_state.errors_history = {}
@@ -107,12 +108,10 @@ def refresh_page_to_remove_ghost(session_state):
 
 
 def update_scores_history(session_state, scores_dict):
-    """Update scores history in session state."""
+    """Update scores history in session state, keeping the last SCORES_HISTORY_MAXLEN attempts."""
+    scores_history = session_state.scores_history
     for key, value in scores_dict.items():
-        if key in session_state.scores_history:
-            session_state.scores_history[key].append(value)
-        else:
-            session_state.scores_history[key] = [value]
+        scores_history.setdefault(key, deque(maxlen=SCORES_HISTORY_MAXLEN)).append(value)
 
 
 def update_errors_history(session_state, errors_dict):
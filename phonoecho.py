@@ -18,7 +18,8 @@ from ai_feedback import (
 )
 from audio_process import save_audio_to_file
 from chart import (
-    create_radar_chart,
+    build_assessed_utterance,
+    create_radar_chart_png,
     create_syllable_table,
     create_waveform_plot,
     create_doughnut_chart,
@@ -80,10 +81,17 @@ with tabs[0]:
                 audio_file_path = f"assets/history_database/{user}/{lesson}-{st.session_state.practice_times}.wav"
                 # save_audio_to_file will make sure the directory exists
                 save_audio_to_file(audio_bytes_io, filename=audio_file_path)
-                pronunciation_assessment_result = get_pronunciation_assessment(user, st.session_state.pronunciation_config, reference_text, audio_file_path)
+                pronunciation_assessment_result = get_pronunciation_assessment(
+                    user,
+                    st.session_state.pronunciation_config,
+                    reference_text,
+                    audio_file_path,
+                    audio_bytes=audio_bytes_io.getvalue(),
+                )
                 with open(f"assets/history_database/{user}/{lesson}-{st.session_state.practice_times}.json", "w", encoding="utf-8") as f:
                     json.dump(pronunciation_assessment_result, f, ensure_ascii=False, indent=4)
                 scores_dict, errors_dict, lowest_word_phonemes_dict = parse_pronunciation_assessment(pronunciation_assessment_result)
+                assessed_utterance = build_assessed_utterance(pronunciation_assessment_result)
                 update_scores_history(st.session_state, scores_dict)
                 update_errors_history(st.session_state, errors_dict)
 
@@ -129,9 +137,9 @@ with tabs[0]:
             height=400, horizontal_alignment="center", vertical_alignment="center"
         ):
             if pronunciation_assessment_result is not None:
-                radar_chart = create_radar_chart(pronunciation_assessment_result)
+                radar_chart = create_radar_chart_png(pronunciation_assessment_result, assessed=assessed_utterance)
                 st.session_state["feedback"]["radar_chart"] = radar_chart
-                st.pyplot(radar_chart, width=450)
+                st.image(radar_chart, width=450)
             else:
                 st.html("<h1 style='text-align: center;'>発音評価のレーダーチャート</h1>")
 
@@ -161,7 +169,7 @@ with tabs[1]:
         height=300, horizontal_alignment="center", vertical_alignment="center"
     ):
         if pronunciation_assessment_result is not None:
-            syllable_table = create_syllable_table(pronunciation_assessment_result)
+            syllable_table = create_syllable_table(pronunciation_assessment_result, assessed=assessed_utterance)
             st.html(syllable_table)
         else:
             st.html("<h1 style='text-align: center;'>音節別の発音評価統計表</h1>")
@@ -186,7 +194,7 @@ with tabs[1]:
         with st.container(height=500):
             if pronunciation_assessment_result is not None:
                 # this function is under fragment decorator in chart.py
-                create_waveform_plot(st.session_state.sentence_order, user, lesson, st.session_state.practice_times, lowest_word_phonemes_dict, pronunciation_assessment_result)
+                create_waveform_plot(st.session_state.sentence_order, user, lesson, st.session_state.practice_times, lowest_word_phonemes_dict, pronunciation_assessment_result, assessed=assessed_utterance)
             else:
                 st.html(
                     "<div style='display: flex; flex-direction: column; align-items: center; justify-content: center; height: 400px;'><h1 style='text-align: center;'>発音波形の可視化</h1></div>"
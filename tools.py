@@ -1,5 +1,56 @@
+import json
+import os
 import streamlit as st
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; large files are then loaded whole
+    ijson = None
+
+# Files at or above this size are stream-parsed when ijson is available
+STREAM_JSON_MIN_BYTES = 256 * 1024
+
+def loads_json(data):
+    """Decode a JSON document from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_json_pretty(obj):
+    """Encode obj as 2-space indented JSON text, keeping non-ASCII characters as-is."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+def load_json_file(path):
+    """Read and decode a UTF-8 JSON file with loads_json."""
+    with open(path, "rb") as f:
+        return loads_json(f.read())
+
+def load_best_recognition(path):
+    """
+    Load a pronunciation result keeping only its first NBest entry.
+    
+    Large files are stream-parsed with ijson (when installed) and reading stops
+    once NBest[0] is complete, so the remaining hypotheses are never decoded.
+    
+    Args:
+        path (str): Path to a pronunciation assessment JSON file
+        
+    Returns:
+        dict: {"NBest": [best]} for streamed files, otherwise the full result
+    """
+    if ijson is None or os.path.getsize(path) < STREAM_JSON_MIN_BYTES:
+        return load_json_file(path)
+    with open(path, "rb") as f:
+        best = next(ijson.items(f, "NBest.item", use_float=True), None)
+    return {"NBest": [best] if best is not None else []}
+
 def delete_none_ai_history(session_state, property_name: str):
     """Delete AI messages with None content from session state."""
     if property_name in session_state: